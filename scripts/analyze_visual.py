@@ -4,6 +4,7 @@ Analyze visual aspects of a web page using Playwright.
 
 Usage:
     python analyze_visual.py https://example.com
+    python analyze_visual.py https://example.com --json --trace trace.json
 """
 
 import argparse
@@ -13,6 +14,8 @@ import socket
 import sys
 from urllib.parse import urlparse
 
+from stage_timing import StageTimer, run_profiled, write_chrome_trace
+
 try:
     from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
 except ImportError:
@@ -20,13 +23,14 @@ except ImportError:
     sys.exit(1)
 
 
-def analyze_visual(url: str, timeout: int = 30000) -> dict:
+def analyze_visual(url: str, timeout: int = 30000, trace: bool = False) -> dict:
     """
     Analyze visual aspects of a web page.
 
     Args:
         url: URL to analyze
         timeout: Page load timeout in milliseconds
+        trace: Record per-stage timing spans (dns, browser_launch, navigate, checks)
 
     Returns:
         Dictionary with visual analysis results
@@ -53,11 +57,15 @@ def analyze_visual(url: str, timeout: int = 30000) -> dict:
         },
         "error": None,
     }
+    timer = StageTimer(enabled=trace, category="visual")
+    if trace:
+        result["timings"] = timer.spans
 
     # SSRF prevention: block private/internal IPs
     try:
         parsed = urlparse(url)
-        resolved_ip = socket.gethostbyname(parsed.hostname)
+        with timer.stage("dns", host=parsed.hostname):
+            resolved_ip = socket.gethostbyname(parsed.hostname)
         ip = ipaddress.ip_address(resolved_ip)
         if ip.is_private or ip.is_loopback or ip.is_reserved:
             result["error"] = f"Blocked: URL resolves to private/internal IP ({resolved_ip})"
@@ -67,86 +75,91 @@ def analyze_visual(url: str, timeout: int = 30000) -> dict:
 
     try:
         with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
+            with timer.stage("browser_launch"):
+                browser = p.chromium.launch(headless=True)
 
             # Desktop analysis
             desktop = browser.new_context(viewport={"width": 1920, "height": 1080})
             page = desktop.new_page()
-            page.goto(url, wait_until="networkidle", timeout=timeout)
-
-            # Check H1 visibility above fold
-            h1 = page.query_selector("h1")
-            if h1:
-                box = h1.bounding_box()
-                if box and box["y"] < 1080:
-                    result["above_fold"]["h1_visible"] = True
-
-            # Check for CTA buttons above fold
-            cta_selectors = [
-                "a[href*='signup']",
-                "a[href*='contact']",
-                "a[href*='demo']",
-                "button:has-text('Get Started')",
-                "button:has-text('Sign Up')",
-                "button:has-text('Contact')",
-                ".cta",
-                "[class*='cta']",
-            ]
-            for selector in cta_selectors:
-                try:
-                    cta = page.query_selector(selector)
-                    if cta:
-                        box = cta.bounding_box()
-                        if box and box["y"] < 1080:
-                            result["above_fold"]["cta_visible"] = True
-                            break
-                except Exception:
-                    pass
-
-            # Check hero image
-            hero_selectors = [
-                ".hero img",
-                "[class*='hero'] img",
-                "header img",
-                "main img:first-of-type",
-            ]
-            for selector in hero_selectors:
-                try:
-                    hero = page.query_selector(selector)
-                    if hero:
-                        src = hero.get_attribute("src")
-                        if src:
-                            result["above_fold"]["hero_image"] = src
-                            break
-                except Exception:
-                    pass
+            with timer.stage("navigate", viewport="desktop"):
+                page.goto(url, wait_until="networkidle", timeout=timeout)
+
+            with timer.stage("checks", viewport="desktop"):
+                # Check H1 visibility above fold
+                h1 = page.query_selector("h1")
+                if h1:
+                    box = h1.bounding_box()
+                    if box and box["y"] < 1080:
+                        result["above_fold"]["h1_visible"] = True
+
+                # Check for CTA buttons above fold
+                cta_selectors = [
+                    "a[href*='signup']",
+                    "a[href*='contact']",
+                    "a[href*='demo']",
+                    "button:has-text('Get Started')",
+                    "button:has-text('Sign Up')",
+                    "button:has-text('Contact')",
+                    ".cta",
+                    "[class*='cta']",
+                ]
+                for selector in cta_selectors:
+                    try:
+                        cta = page.query_selector(selector)
+                        if cta:
+                            box = cta.bounding_box()
+                            if box and box["y"] < 1080:
+                                result["above_fold"]["cta_visible"] = True
+                                break
+                    except Exception:
+                        pass
+
+                # Check hero image
+                hero_selectors = [
+                    ".hero img",
+                    "[class*='hero'] img",
+                    "header img",
+                    "main img:first-of-type",
+                ]
+                for selector in hero_selectors:
+                    try:
+                        hero = page.query_selector(selector)
+                        if hero:
+                            src = hero.get_attribute("src")
+                            if src:
+                                result["above_fold"]["hero_image"] = src
+                                break
+                    except Exception:
+                        pass
 
             desktop.close()
 
             # Mobile analysis
             mobile = browser.new_context(viewport={"width": 375, "height": 812})
             page = mobile.new_page()
-            page.goto(url, wait_until="networkidle", timeout=timeout)
-
-            # Check viewport meta
-            viewport_meta = page.query_selector('meta[name="viewport"]')
-            result["mobile"]["viewport_meta"] = viewport_meta is not None
-
-            # Check for horizontal scroll
-            scroll_width = page.evaluate("document.documentElement.scrollWidth")
-            viewport_width = page.evaluate("window.innerWidth")
-            result["mobile"]["horizontal_scroll"] = scroll_width > viewport_width
-
-            # Check font size
-            base_font_size = page.evaluate("""
-                () => {
-                    const body = document.body;
-                    const style = window.getComputedStyle(body);
-                    return parseFloat(style.fontSize);
-                }
-            """)
-            result["fonts"]["base_size"] = base_font_size
-            result["fonts"]["readable"] = base_font_size >= 16
+            with timer.stage("navigate", viewport="mobile"):
+                page.goto(url, wait_until="networkidle", timeout=timeout)
+
+            with timer.stage("checks", viewport="mobile"):
+                # Check viewport meta
+                viewport_meta = page.query_selector('meta[name="viewport"]')
+                result["mobile"]["viewport_meta"] = viewport_meta is not None
+
+                # Check for horizontal scroll
+                scroll_width = page.evaluate("document.documentElement.scrollWidth")
+                viewport_width = page.evaluate("window.innerWidth")
+                result["mobile"]["horizontal_scroll"] = scroll_width > viewport_width
+
+                # Check font size
+                base_font_size = page.evaluate("""
+                    () => {
+                        const body = document.body;
+                        const style = window.getComputedStyle(body);
+                        return parseFloat(style.fontSize);
+                    }
+                """)
+                result["fonts"]["base_size"] = base_font_size
+                result["fonts"]["readable"] = base_font_size >= 16
 
             mobile.close()
             browser.close()
@@ -164,10 +177,19 @@ def main():
     parser.add_argument("url", help="URL to analyze")
     parser.add_argument("--timeout", "-t", type=int, default=30000, help="Timeout in ms")
     parser.add_argument("--json", "-j", action="store_true", help="Output as JSON")
+    parser.add_argument("--trace", help="Write per-stage timings as Chrome trace JSON to this file")
+    parser.add_argument("--profile", help="Run under cProfile and write stats to this file")
 
     args = parser.parse_args()
 
-    result = analyze_visual(args.url, timeout=args.timeout)
+    kwargs = {"timeout": args.timeout, "trace": bool(args.trace)}
+    if args.profile:
+        result = run_profiled(args.profile, analyze_visual, args.url, **kwargs)
+    else:
+        result = analyze_visual(args.url, **kwargs)
+
+    if args.trace:
+        write_chrome_trace(result["timings"], args.trace)
 
     if args.json:
         print(json.dumps(result, indent=2))
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Audit image weight, intrinsic dimensions and format across a crawl.
+
+Each unique image URL is checked once, however many pages use it: a HEAD
+request gives byte size, type and ETag, then a small Range request fetches
+only the leading bytes, from which Pillow reads the format and intrinsic
+dimensions. Results are cached by URL + ETag in the crawl store, so a
+re-audit only re-probes images whose ETag changed.
+
+Usage:
+    python audit_images.py crawl.db
+    python audit_images.py crawl.db --workers 16 --json
+    python audit_images.py --jsonl images.jsonl
+"""
+
+import argparse
+import io
+import json
+import os
+import sqlite3
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+try:
+    from PIL import Image, ImageFile
+except ImportError:
+    print("Error: Pillow required. Install with: pip install Pillow")
+    sys.exit(1)
+
+from fetch_page import DEFAULT_HEADERS, blocked_reason, create_session
+
+IMAGE_HEADERS = dict(DEFAULT_HEADERS, Accept="image/avif,image/webp,image/*,*/*;q=0.8")
+
+# Bytes read for format/dimension sniffing; enough for JPEG SOF markers in nearly all files
+PROBE_BYTES = 64 * 1024
+
+# Content image thresholds from skills/seo-images/SKILL.md
+OVERSIZED_WARNING = 200 * 1024
+OVERSIZED_CRITICAL = 500 * 1024
+
+MODERN_FORMATS = {"WEBP", "AVIF", "SVG", "JXL"}
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS image_meta (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    status_code INTEGER,
+    bytes INTEGER,
+    content_type TEXT,
+    format TEXT,
+    width INTEGER,
+    height INTEGER,
+    error TEXT,
+    checked_at REAL
+);
+"""
+
+
+def _total_size(response) -> Optional[int]:
+    """Total object size from Content-Range ("bytes 0-65535/123456") or Content-Length."""
+    content_range = response.headers.get("Content-Range", "")
+    if "/" in content_range:
+        total = content_range.rsplit("/", 1)[1]
+        if total.isdigit():
+            return int(total)
+    length = response.headers.get("Content-Length")
+    return int(length) if length and length.isdigit() else None
+
+
+def _sniff_webp_avif(data: bytes) -> Optional[dict]:
+    """
+    Read WebP/AVIF headers directly; Pillow needs the whole file for these.
+
+    Returns:
+        Dictionary with format, width and height, or None if neither format
+    """
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        info = {"format": "WEBP", "width": None, "height": None}
+        chunk = data[12:16]
+        if chunk == b"VP8X" and len(data) >= 30:
+            info["width"] = int.from_bytes(data[24:27], "little") + 1
+            info["height"] = int.from_bytes(data[27:30], "little") + 1
+        elif chunk == b"VP8 " and len(data) >= 30 and data[23:26] == b"\x9d\x01\x2a":
+            info["width"] = int.from_bytes(data[26:28], "little") & 0x3FFF
+            info["height"] = int.from_bytes(data[28:30], "little") & 0x3FFF
+        elif chunk == b"VP8L" and len(data) >= 25 and data[20] == 0x2F:
+            bits = int.from_bytes(data[21:25], "little")
+            info["width"] = (bits & 0x3FFF) + 1
+            info["height"] = ((bits >> 14) & 0x3FFF) + 1
+        return info
+
+    if data[4:8] == b"ftyp" and data[8:12] in (b"avif", b"avis"):
+        info = {"format": "AVIF", "width": None, "height": None}
+        pos = data.find(b"ispe")
+        if pos != -1 and len(data) >= pos + 16:
+            # ispe: 4-byte version/flags, then 32-bit width and height
+            info["width"] = int.from_bytes(data[pos + 8:pos + 12], "big")
+            info["height"] = int.from_bytes(data[pos + 12:pos + 16], "big")
+        return info
+
+    return None
+
+
+def sniff_image(data: bytes) -> dict:
+    """
+    Read format and intrinsic dimensions from the leading bytes of an image.
+
+    Returns:
+        Dictionary with format, width and height (None when undetermined)
+    """
+    info = {"format": None, "width": None, "height": None}
+    head = data[:512].lstrip().lower()
+    if head.startswith(b"<svg") or (head.startswith(b"<?xml") and b"<svg" in data[:2048].lower()):
+        info["format"] = "SVG"
+        return info
+
+    modern = _sniff_webp_avif(data)
+    if modern:
+        return modern
+
+    parser = ImageFile.Parser()
+    try:
+        parser.feed(data)
+    except Exception:
+        pass
+    image = parser.image
+    if image is None:
+        # Parser needs the full header in one go for some formats; try a direct open
+        try:
+            image = Image.open(io.BytesIO(data))
+        except Exception:
+            return info
+    info["format"] = image.format
+    info["width"], info["height"] = image.size
+    return info
+
+
+def probe_image(url: str, session, timeout: int = 15, cached: Optional[dict] = None) -> dict:
+    """
+    Probe one image URL with HEAD plus a bounded Range request.
+
+    Args:
+        url: Image URL
+        session: Pooled requests session (see fetch_page.create_session)
+        timeout: Per-request timeout in seconds
+        cached: Previous result for this URL; reused if its ETag still matches
+
+    Returns:
+        Dictionary with url, etag, status_code, bytes, content_type, format,
+        width, height and error
+    """
+    result = {
+        "url": url,
+        "etag": None,
+        "status_code": None,
+        "bytes": None,
+        "content_type": None,
+        "format": None,
+        "width": None,
+        "height": None,
+        "error": None,
+    }
+
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https"):
+        result["error"] = f"Unsupported URL scheme: {parsed.scheme or 'none'}"
+        return result
+
+    blocked = blocked_reason(parsed.hostname)
+    if blocked:
+        result["error"] = blocked
+        return result
+
+    try:
+        head = session.head(url, headers=IMAGE_HEADERS, timeout=timeout, allow_redirects=True)
+        result["status_code"] = head.status_code
+        result["etag"] = head.headers.get("ETag")
+        result["content_type"] = head.headers.get("Content-Type")
+        result["bytes"] = _total_size(head)
+        if head.status_code >= 400:
+            # Headers describe the error page, not the image; take them from the GET
+            result.update(etag=None, content_type=None, bytes=None)
+
+        if cached and result["etag"] and cached.get("etag") == result["etag"] and not cached.get("error"):
+            return dict(cached, status_code=head.status_code)
+
+        if head.status_code >= 400 and head.status_code not in (403, 405):
+            result["error"] = f"HTTP {head.status_code}"
+            return result
+
+        # Some servers reject HEAD (403/405); the Range GET below still works
+        headers = dict(IMAGE_HEADERS, Range=f"bytes=0-{PROBE_BYTES - 1}")
+        with session.get(url, headers=headers, timeout=timeout, stream=True) as response:
+            result["status_code"] = response.status_code
+            if response.status_code >= 400:
+                result["error"] = f"HTTP {response.status_code}"
+                return result
+            result["etag"] = result["etag"] or response.headers.get("ETag")
+            result["content_type"] = result["content_type"] or response.headers.get("Content-Type")
+            if response.status_code == 206 or result["bytes"] is None:
+                result["bytes"] = _total_size(response) or result["bytes"]
+
+            # A server that ignores Range sends the whole body: stop after PROBE_BYTES
+            data = b""
+            for chunk in response.iter_content(chunk_size=16 * 1024):
+                data += chunk
+                if len(data) >= PROBE_BYTES:
+                    break
+
+        result.update(sniff_image(data[:PROBE_BYTES]))
+    except Exception as e:
+        result["error"] = f"Request failed: {e}"
+
+    return result
+
+
+def audit_images(
+    usages: Iterable[dict],
+    workers: int = 8,
+    timeout: int = 15,
+    cache: Optional[Dict[str, dict]] = None,
+) -> dict:
+    """
+    Probe every unique image once and flag problems site-wide.
+
+    Args:
+        usages: Records of {page, src, width, height} (one per <img> on a page)
+        workers: Maximum concurrent image probes
+        timeout: Per-request timeout in seconds
+        cache: url -> previous probe result, for ETag revalidation
+
+    Returns:
+        Dictionary with images (one entry per unique URL, with issues and
+        page counts), probes (raw probe results) and summary counts
+    """
+    cache = cache or {}
+    pages_by_src: Dict[str, set] = defaultdict(set)
+    unsized_pages: Dict[str, set] = defaultdict(set)
+    declared_widths: Dict[str, set] = defaultdict(set)
+
+    for usage in usages:
+        src = usage.get("src")
+        if not src or src.startswith("data:"):
+            continue
+        pages_by_src[src].add(usage["page"])
+        if not (usage.get("width") and usage.get("height")):
+            unsized_pages[src].add(usage["page"])
+        width = str(usage.get("width") or "").strip().rstrip("px")
+        if width.isdigit():
+            declared_widths[src].add(int(width))
+
+    session = create_session(pool_size=workers)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        probes = list(pool.map(
+            lambda src: probe_image(src, session, timeout=timeout, cached=cache.get(src)),
+            sorted(pages_by_src),
+        ))
+
+    images = []
+    summary = defaultdict(int)
+    for probe in probes:
+        src = probe["url"]
+        issues = []
+        if probe["error"]:
+            issues.append({"type": "broken", "severity": "Critical", "detail": probe["error"]})
+        else:
+            size = probe["bytes"]
+            if size and size > OVERSIZED_CRITICAL:
+                issues.append({"type": "oversized", "severity": "Critical", "detail": f"{size // 1024}KB"})
+            elif size and size > OVERSIZED_WARNING:
+                issues.append({"type": "oversized", "severity": "Warning", "detail": f"{size // 1024}KB"})
+            if probe["format"] and probe["format"].upper() not in MODERN_FORMATS:
+                issues.append({"type": "wrong_format", "severity": "Warning",
+                               "detail": f"{probe['format']} — serve WebP/AVIF"})
+            if probe["width"] and declared_widths[src]:
+                largest = max(declared_widths[src])
+                if largest and probe["width"] > 2 * largest:
+                    issues.append({"type": "oversized_dimensions", "severity": "Warning",
+                                   "detail": f"{probe['width']}px intrinsic, displayed at {largest}px"})
+        if unsized_pages[src]:
+            issues.append({"type": "unsized", "severity": "Warning",
+                           "detail": f"missing width/height on {len(unsized_pages[src])} pages"})
+
+        for issue in issues:
+            summary[issue["type"]] += 1
+        images.append({
+            "src": src,
+            "pages": len(pages_by_src[src]),
+            "bytes": probe["bytes"],
+            "format": probe["format"],
+            "width": probe["width"],
+            "height": probe["height"],
+            "issues": issues,
+        })
+
+    # Largest total transfer first: bytes x pages using it
+    images.sort(key=lambda img: -((img["bytes"] or 0) * img["pages"]))
+    summary["unique_images"] = len(images)
+    summary["image_usages"] = sum(len(p) for p in pages_by_src.values())
+    return {"images": images, "probes": probes, "summary": dict(summary)}
+
+
+def load_store_usages(db_path: str) -> List[dict]:
+    """Read <img> usages from the crawl store's images table."""
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        return [dict(row) for row in conn.execute("SELECT page, src, width, height FROM images")]
+    finally:
+        conn.close()
+
+
+def load_cache(db_path: str) -> Dict[str, dict]:
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        conn.executescript(CACHE_SCHEMA)
+        return {row["url"]: dict(row) for row in conn.execute("SELECT * FROM image_meta")}
+    finally:
+        conn.close()
+
+
+def save_cache(db_path: str, probes: List[dict]) -> None:
+    conn = sqlite3.connect(db_path, timeout=30)
+    now = time.time()
+    try:
+        with conn:
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO image_meta
+                    (url, etag, status_code, bytes, content_type, format, width, height, error, checked_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (p["url"], p["etag"], p["status_code"], p["bytes"], p["content_type"],
+                     p["format"], p["width"], p["height"], p["error"], now)
+                    for p in probes
+                ],
+            )
+    finally:
+        conn.close()
+
+
+def _read_jsonl(path: str) -> Iterable[dict]:
+    """Read {page, images} (parse_html style) or flat {page, src, ...} records."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if "images" in record:
+                for img in record["images"]:
+                    yield dict(img, page=record.get("page") or record.get("url"))
+            else:
+                yield record
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit image weight, dimensions and format site-wide")
+    parser.add_argument("db", nargs="?", help="Crawl store database (from crawl_store.py)")
+    parser.add_argument("--jsonl", help="JSON lines file of {page, images} or {page, src, width, height}")
+    parser.add_argument("--workers", "-w", type=int, default=8, help="Concurrent image probes")
+    parser.add_argument("--timeout", "-t", type=int, default=15, help="Timeout in seconds")
+    parser.add_argument("--json", "-j", action="store_true", help="Output as JSON")
+
+    args = parser.parse_args()
+
+    source = args.jsonl or args.db
+    if not source:
+        parser.error("a crawl store database or --jsonl file is required")
+    real_path = os.path.realpath(source)
+    if not os.path.isfile(real_path):
+        print(f"Error: File not found: {source}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.jsonl:
+        result = audit_images(_read_jsonl(real_path), workers=args.workers, timeout=args.timeout)
+    else:
+        result = audit_images(
+            load_store_usages(real_path),
+            workers=args.workers,
+            timeout=args.timeout,
+            cache=load_cache(real_path),
+        )
+        save_cache(real_path, result["probes"])
+
+    if args.json:
+        print(json.dumps({"images": result["images"], "summary": result["summary"]}, indent=2))
+    else:
+        summary = result["summary"]
+        print(f"Unique Images: {summary['unique_images']} ({summary['image_usages']} usages)")
+        for issue_type in ("broken", "oversized", "oversized_dimensions", "wrong_format", "unsized"):
+            print(f"{issue_type.replace('_', ' ').title()}: {summary.get(issue_type, 0)}")
+        print("\nLargest by total transfer:")
+        for img in result["images"][:20]:
+            size = f"{img['bytes'] // 1024}KB" if img["bytes"] else "?"
+            dims = f"{img['width']}x{img['height']}" if img["width"] else "?"
+            print(f"  {size:>8} {img['format'] or '?':>5} {dims:>11} x{img['pages']:<5} {img['src']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ Usage:
     python capture_screenshot.py https://example.com
     python capture_screenshot.py https://example.com --mobile
     python capture_screenshot.py https://example.com --output screenshots/
+    python capture_screenshot.py https://example.com --all --trace trace.json
 """
 
 import argparse
@@ -13,6 +14,8 @@ import os
 import sys
 from urllib.parse import urlparse
 
+from stage_timing import StageTimer, run_profiled, write_chrome_trace
+
 try:
     from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
 except ImportError:
@@ -34,6 +37,7 @@ def capture_screenshot(
     viewport: str = "desktop",
     full_page: bool = False,
     timeout: int = 30000,
+    trace: bool = False,
 ) -> dict:
     """
     Capture a screenshot of a web page.
@@ -44,6 +48,7 @@ def capture_screenshot(
         viewport: Viewport preset (desktop, laptop, tablet, mobile)
         full_page: Whether to capture full page or just viewport
         timeout: Page load timeout in milliseconds
+        trace: Record per-stage timing spans (browser_launch, navigate, settle, screenshot)
 
     Returns:
         Dictionary with capture results
@@ -55,6 +60,9 @@ def capture_screenshot(
         "success": False,
         "error": None,
     }
+    timer = StageTimer(enabled=trace, category="screenshot")
+    if trace:
+        result["timings"] = timer.spans
 
     if viewport not in VIEWPORTS:
         result["error"] = f"Invalid viewport: {viewport}. Choose from: {list(VIEWPORTS.keys())}"
@@ -64,7 +72,8 @@ def capture_screenshot(
 
     try:
         with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
+            with timer.stage("browser_launch"):
+                browser = p.chromium.launch(headless=True)
             context = browser.new_context(
                 viewport={"width": vp["width"], "height": vp["height"]},
                 device_scale_factor=2 if viewport == "mobile" else 1,
@@ -72,13 +81,16 @@ def capture_screenshot(
             page = context.new_page()
 
             # Navigate and wait for network idle
-            page.goto(url, wait_until="networkidle", timeout=timeout)
+            with timer.stage("navigate", viewport=viewport):
+                page.goto(url, wait_until="networkidle", timeout=timeout)
 
             # Wait a bit more for any lazy-loaded content
-            page.wait_for_timeout(1000)
+            with timer.stage("settle"):
+                page.wait_for_timeout(1000)
 
             # Capture screenshot
-            page.screenshot(path=output_path, full_page=full_page)
+            with timer.stage("screenshot", full_page=full_page):
+                page.screenshot(path=output_path, full_page=full_page)
 
             result["success"] = True
             browser.close()
@@ -91,6 +103,32 @@ def capture_screenshot(
     return result
 
 
+def capture_all(args, base_name: str, viewports) -> list:
+    """Capture each requested viewport and return the collected timing spans."""
+    spans = []
+    for viewport in viewports:
+        filename = f"{base_name}_{viewport}.png"
+        output_path = os.path.join(args.output, filename)
+
+        print(f"Capturing {viewport} screenshot...")
+        result = capture_screenshot(
+            args.url,
+            output_path,
+            viewport=viewport,
+            full_page=args.full,
+            timeout=args.timeout,
+            trace=bool(args.trace),
+        )
+        spans.extend(result.get("timings", []))
+
+        if result["success"]:
+            print(f"  [OK] Saved to {output_path}")
+        else:
+            print(f"  [FAIL] {result['error']}")
+
+    return spans
+
+
 def main():
     parser = argparse.ArgumentParser(description="Capture web page screenshots")
     parser.add_argument("url", help="URL to capture")
@@ -99,6 +137,8 @@ def main():
     parser.add_argument("--all", "-a", action="store_true", help="Capture all viewports")
     parser.add_argument("--full", "-f", action="store_true", help="Capture full page")
     parser.add_argument("--timeout", "-t", type=int, default=30000, help="Timeout in ms")
+    parser.add_argument("--trace", help="Write per-stage timings as Chrome trace JSON to this file")
+    parser.add_argument("--profile", help="Run under cProfile and write stats to this file")
 
     args = parser.parse_args()
 
@@ -119,23 +159,13 @@ def main():
 
     viewports = VIEWPORTS.keys() if args.all else [args.viewport]
 
-    for viewport in viewports:
-        filename = f"{base_name}_{viewport}.png"
-        output_path = os.path.join(args.output, filename)
-
-        print(f"Capturing {viewport} screenshot...")
-        result = capture_screenshot(
-            args.url,
-            output_path,
-            viewport=viewport,
-            full_page=args.full,
-            timeout=args.timeout,
-        )
+    if args.profile:
+        spans = run_profiled(args.profile, capture_all, args, base_name, viewports)
+    else:
+        spans = capture_all(args, base_name, viewports)
 
-        if result["success"]:
-            print(f"  [OK] Saved to {output_path}")
-        else:
-            print(f"  [FAIL] {result['error']}")
+    if args.trace:
+        write_chrome_trace(spans, args.trace)
 
 
 if __name__ == "__main__":
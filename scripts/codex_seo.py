@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Unified Codex SEO command line with a persistent JSON-RPC worker mode.
+
+Heavy dependencies (requests, bs4/lxml, Playwright) are imported only when a
+subcommand needs them. ``serve`` keeps one warm process that reads
+newline-delimited JSON-RPC 2.0 requests on stdin and writes one response per
+line on stdout, so a multi-page audit pays interpreter and import startup once.
+
+Usage:
+    python codex_seo.py fetch https://example.com
+    python codex_seo.py parse page.html --url https://example.com
+    python codex_seo.py validate page.html
+    python codex_seo.py visual https://example.com
+    python codex_seo.py screenshot https://example.com --viewport mobile
+    python codex_seo.py serve
+
+Worker protocol (one JSON object per line):
+    -> {"jsonrpc": "2.0", "id": 1, "method": "fetch", "params": {"url": "https://example.com"}}
+    <- {"jsonrpc": "2.0", "id": 1, "result": {"url": "https://example.com/", "status_code": 200, ...}}
+
+Methods: fetch, parse, validate, visual, screenshot, ping, shutdown.
+"""
+
+import argparse
+import contextlib
+import importlib
+import inspect
+import json
+import os
+import sys
+from typing import Callable, Dict, Optional
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+
+class RPCError(Exception):
+    """Error reported back to the client as a JSON-RPC error object."""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def _load(module_name: str):
+    """
+    Import a sibling script module on first use.
+
+    The scripts print an install hint and exit when a dependency is missing.
+    Redirect that hint to stderr so it never corrupts the worker's stdout
+    stream, and turn the exit into an RPCError.
+    """
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+
+    if SCRIPT_DIR not in sys.path:
+        sys.path.insert(0, SCRIPT_DIR)
+
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            return importlib.import_module(module_name)
+    except SystemExit:
+        raise RPCError(INTERNAL_ERROR, f"Missing dependency for {module_name}; see stderr")
+
+
+def load_schema_validator():
+    """Load the schema hook module, reporting a missing hook as an RPCError."""
+    try:
+        return _load("schema_hook").load_schema_validator()
+    except FileNotFoundError as e:
+        raise RPCError(INTERNAL_ERROR, str(e))
+
+
+def _read_file(path: str) -> str:
+    """Read an input file, rejecting paths that do not resolve to a regular file."""
+    real_path = os.path.realpath(path)
+    if not os.path.isfile(real_path):
+        raise RPCError(INVALID_PARAMS, f"File not found: {path}")
+    with open(real_path, "r", encoding="utf-8", errors="ignore") as f:
+        return f.read()
+
+
+def _safe_output_path(path: str) -> str:
+    """Apply the same traversal guard as capture_screenshot.py to an output path."""
+    real_path = os.path.realpath(path)
+    cwd = os.getcwd()
+    home = os.path.expanduser("~")
+    if not (real_path.startswith(cwd) or real_path.startswith(home)):
+        raise RPCError(INVALID_PARAMS, "Output path must be within current directory or home directory")
+    return real_path
+
+
+class Worker:
+    """Dispatch method calls, keeping loaded modules and the HTTP session warm."""
+
+    def __init__(self):
+        self._session = None
+        self.running = True
+        self.methods: Dict[str, Callable[..., dict]] = {
+            "fetch": self.fetch,
+            "parse": self.parse,
+            "validate": self.validate,
+            "visual": self.visual,
+            "screenshot": self.screenshot,
+            "ping": self.ping,
+            "shutdown": self.shutdown,
+        }
+
+    def fetch(
+        self,
+        url: str,
+        timeout: int = 30,
+        follow_redirects: bool = True,
+        max_redirects: int = 5,
+        trace: bool = False,
+    ) -> dict:
+        fetch_page = _load("fetch_page")
+        if self._session is None:
+            self._session = fetch_page.create_session()
+        return fetch_page.fetch_page(
+            url,
+            timeout=timeout,
+            follow_redirects=follow_redirects,
+            max_redirects=max_redirects,
+            trace=trace,
+            session=self._session,
+        )
+
+    def parse(
+        self,
+        html: Optional[str] = None,
+        path: Optional[str] = None,
+        base_url: Optional[str] = None,
+        trace: bool = False,
+    ) -> dict:
+        if html is None:
+            if path is None:
+                raise RPCError(INVALID_PARAMS, "parse requires 'html' or 'path'")
+            html = _read_file(path)
+        return _load("parse_html").parse_html(html, base_url, trace=trace)
+
+    def validate(self, html: Optional[str] = None, path: Optional[str] = None) -> dict:
+        if html is None:
+            if path is None:
+                raise RPCError(INVALID_PARAMS, "validate requires 'html' or 'path'")
+            html = _read_file(path)
+        errors = load_schema_validator().validate_jsonld(html)
+        return {"valid": not errors, "errors": errors}
+
+    def visual(self, url: str, timeout: int = 30000, trace: bool = False) -> dict:
+        return _load("analyze_visual").analyze_visual(url, timeout=timeout, trace=trace)
+
+    def screenshot(
+        self,
+        url: str,
+        output: str,
+        viewport: str = "desktop",
+        full_page: bool = False,
+        timeout: int = 30000,
+        trace: bool = False,
+    ) -> dict:
+        output = _safe_output_path(output)
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        return _load("capture_screenshot").capture_screenshot(
+            url,
+            output,
+            viewport=viewport,
+            full_page=full_page,
+            timeout=timeout,
+            trace=trace,
+        )
+
+    def ping(self) -> dict:
+        return {"pid": os.getpid(), "loaded": sorted(
+            name for name in ("fetch_page", "parse_html", "analyze_visual", "capture_screenshot")
+            if name in sys.modules
+        )}
+
+    def shutdown(self) -> dict:
+        self.running = False
+        return {"ok": True}
+
+    def handle(self, request) -> Optional[dict]:
+        """
+        Handle one decoded JSON-RPC request.
+
+        Returns:
+            Response dict, or None for notifications (requests without an id)
+        """
+        if (
+            not isinstance(request, dict)
+            or request.get("jsonrpc") != "2.0"
+            or not isinstance(request.get("method"), str)
+        ):
+            return _error_response(None, INVALID_REQUEST, "Invalid Request")
+
+        request_id = request.get("id")
+        is_notification = "id" not in request
+        params = request.get("params", {})
+        method = self.methods.get(request["method"])
+
+        try:
+            if method is None:
+                raise RPCError(METHOD_NOT_FOUND, f"Method not found: {request['method']}")
+            if isinstance(params, dict):
+                args, kwargs = (), params
+            elif isinstance(params, list):
+                args, kwargs = params, {}
+            else:
+                raise RPCError(INVALID_PARAMS, "params must be an object or array")
+            try:
+                inspect.signature(method).bind(*args, **kwargs)
+            except TypeError as e:
+                raise RPCError(INVALID_PARAMS, f"Invalid params: {e}")
+            result = method(*args, **kwargs)
+        except RPCError as e:
+            return None if is_notification else _error_response(request_id, e.code, e.message)
+        except Exception as e:
+            return None if is_notification else _error_response(request_id, INTERNAL_ERROR, str(e))
+
+        if is_notification:
+            return None
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+
+def _error_response(request_id, code: int, message: str) -> dict:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+def serve(stdin=None, stdout=None) -> None:
+    """Read newline-delimited JSON-RPC requests and write one response per line."""
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    worker = Worker()
+
+    for line in stdin:
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            response = _error_response(None, PARSE_ERROR, f"Parse error: {e}")
+        else:
+            if isinstance(request, list) and not request:
+                response = _error_response(None, INVALID_REQUEST, "Invalid Request")
+            elif isinstance(request, list):
+                # Batch: answer with an array of the non-notification responses
+                response = [r for r in (worker.handle(item) for item in request) if r is not None] or None
+            else:
+                response = worker.handle(request)
+
+        if response is not None:
+            stdout.write(json.dumps(response) + "\n")
+            stdout.flush()
+
+        if not worker.running:
+            break
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Codex SEO unified command line")
+    parser.add_argument("--profile", help="Run under cProfile and write stats to this file")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    fetch = sub.add_parser("fetch", help="Fetch a page (JSON output)")
+    fetch.add_argument("url", help="URL to fetch")
+    fetch.add_argument("--timeout", "-t", type=int, default=30, help="Timeout in seconds")
+    fetch.add_argument("--no-redirects", action="store_true", help="Don't follow redirects")
+    fetch.add_argument("--trace", action="store_true", help="Include per-stage timings")
+
+    parse = sub.add_parser("parse", help="Parse HTML from a file or stdin (JSON output)")
+    parse.add_argument("file", nargs="?", help="HTML file to parse")
+    parse.add_argument("--url", "-u", help="Base URL for resolving links")
+    parse.add_argument("--trace", action="store_true", help="Include per-stage timings")
+
+    validate = sub.add_parser("validate", help="Validate JSON-LD in an HTML file or stdin")
+    validate.add_argument("file", nargs="?", help="HTML file to validate")
+
+    visual = sub.add_parser("visual", help="Analyze visual aspects of a page")
+    visual.add_argument("url", help="URL to analyze")
+    visual.add_argument("--timeout", "-t", type=int, default=30000, help="Timeout in ms")
+    visual.add_argument("--trace", action="store_true", help="Include per-stage timings")
+
+    screenshot = sub.add_parser("screenshot", help="Capture a page screenshot")
+    screenshot.add_argument("url", help="URL to capture")
+    screenshot.add_argument("--output", "-o", default="screenshots/page.png", help="Output file path")
+    screenshot.add_argument("--viewport", "-v", default="desktop",
+                            choices=["desktop", "laptop", "tablet", "mobile"])
+    screenshot.add_argument("--full", "-f", action="store_true", help="Capture full page")
+    screenshot.add_argument("--timeout", "-t", type=int, default=30000, help="Timeout in ms")
+    screenshot.add_argument("--trace", action="store_true", help="Include per-stage timings")
+
+    sub.add_parser("serve", help="Run a persistent JSON-RPC worker on stdin/stdout")
+
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        run, run_args = serve, {}
+    else:
+        worker = Worker()
+        if args.command == "fetch":
+            run, run_args = worker.fetch, {
+                "url": args.url,
+                "timeout": args.timeout,
+                "follow_redirects": not args.no_redirects,
+                "trace": args.trace,
+            }
+        elif args.command == "parse":
+            if args.file:
+                run, run_args = worker.parse, {"path": args.file, "base_url": args.url, "trace": args.trace}
+            else:
+                run, run_args = worker.parse, {"html": sys.stdin.read(), "base_url": args.url, "trace": args.trace}
+        elif args.command == "validate":
+            if args.file:
+                run, run_args = worker.validate, {"path": args.file}
+            else:
+                run, run_args = worker.validate, {"html": sys.stdin.read()}
+        elif args.command == "visual":
+            run, run_args = worker.visual, {"url": args.url, "timeout": args.timeout, "trace": args.trace}
+        else:
+            run, run_args = worker.screenshot, {
+                "url": args.url,
+                "output": args.output,
+                "viewport": args.viewport,
+                "full_page": args.full,
+                "timeout": args.timeout,
+                "trace": args.trace,
+            }
+
+    try:
+        if args.profile:
+            from stage_timing import run_profiled
+            result = run_profiled(args.profile, run, **run_args)
+        else:
+            result = run(**run_args)
+    except RPCError as e:
+        print(f"Error: {e.message}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.command == "serve":
+        return
+
+    print(json.dumps(result, indent=2))
+    if isinstance(result, dict) and result.get("error"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+"""
+Local SQLite crawl store with content hashing and incremental re-audit.
+
+Pages are stored with compressed bodies, headers, a SHA-256 content hash, the
+parse_html result and per-page link and image rows. On re-crawl only pages
+whose content hash changed are re-parsed and re-validated, and site-level
+aggregates are adjusted by the difference instead of being recomputed.
+
+Usage:
+    python crawl_store.py crawl crawl.db urls.txt
+    python crawl_store.py crawl crawl.db urls.txt --workers 8 --force
+    python crawl_store.py stats crawl.db --json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    final_url TEXT,
+    status_code INTEGER,
+    headers TEXT,
+    body BLOB,
+    content_hash TEXT,
+    fetched_at REAL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS pages_final_url ON pages(final_url);
+
+CREATE TABLE IF NOT EXISTS parse_results (
+    url TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    data TEXT NOT NULL,
+    text BLOB,
+    schema_errors TEXT,
+    stats TEXT NOT NULL,
+    parsed_at REAL
+);
+
+CREATE TABLE IF NOT EXISTS links (
+    page TEXT NOT NULL,
+    href TEXT NOT NULL,
+    internal INTEGER NOT NULL,
+    text TEXT,
+    rel TEXT
+);
+CREATE INDEX IF NOT EXISTS links_page ON links(page);
+CREATE INDEX IF NOT EXISTS links_href ON links(href);
+
+CREATE TABLE IF NOT EXISTS images (
+    page TEXT NOT NULL,
+    src TEXT NOT NULL,
+    alt TEXT,
+    width TEXT,
+    height TEXT,
+    loading TEXT
+);
+CREATE INDEX IF NOT EXISTS images_page ON images(page);
+CREATE INDEX IF NOT EXISTS images_src ON images(src);
+
+CREATE TABLE IF NOT EXISTS site_stats (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def content_hash(content: str) -> str:
+    """Return the SHA-256 hex digest of a page body."""
+    return hashlib.sha256(content.encode("utf-8", errors="replace")).hexdigest()
+
+
+def page_stats(parsed: dict, schema_errors: List[str]) -> Dict[str, int]:
+    """
+    Compute one page's contribution to the site-level aggregates.
+
+    Args:
+        parsed: parse_html result
+        schema_errors: validate_jsonld errors for the page
+
+    Returns:
+        Dictionary of counter name to value
+    """
+    images = parsed["images"]
+    return {
+        "parsed_pages": 1,
+        "words": parsed["word_count"],
+        "images": len(images),
+        "images_missing_alt": sum(1 for img in images if not img.get("alt")),
+        "images_unsized": sum(1 for img in images if not (img.get("width") and img.get("height"))),
+        "internal_links": len(parsed["links"]["internal"]),
+        "external_links": len(parsed["links"]["external"]),
+        "schema_blocks": len(parsed["schema"]),
+        "schema_errors": len(schema_errors),
+        "missing_title": int(not parsed["title"]),
+        "missing_meta_description": int(not parsed["meta_description"]),
+        "missing_h1": int(not parsed["h1"]),
+        "multiple_h1": int(len(parsed["h1"]) > 1),
+    }
+
+
+class CrawlStore:
+    """
+    SQLite (WAL mode) store shared by concurrent fetchers.
+
+    Writes are queued and committed by a single writer thread in batched
+    transactions, so fetcher threads never contend on the database lock.
+    Reads use a separate connection owned by the creating thread.
+    """
+
+    def __init__(self, path: str, batch_size: int = 50, flush_interval: float = 1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._conn = self._connect()
+        self._conn.executescript(SCHEMA)
+        self._queue: "queue.Queue[Optional[dict]]" = queue.Queue()
+        self._error: Optional[BaseException] = None
+        self._writer = threading.Thread(target=self._write_loop, name="crawl-store-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Writes
+
+    def put_page(
+        self,
+        url: str,
+        fetch_result: dict,
+        parsed: Optional[dict] = None,
+        text: Optional[str] = None,
+        schema_errors: Optional[List[str]] = None,
+    ) -> None:
+        """
+        Queue a fetched page for writing.
+
+        Args:
+            url: Requested URL (primary key)
+            fetch_result: fetch_page result
+            parsed: parse_html result, or None to keep the stored parse
+            text: Visible page text (stored compressed for content checks)
+            schema_errors: validate_jsonld errors for the page
+        """
+        self._raise_writer_error()
+        self._queue.put({
+            "url": url,
+            "fetch": fetch_result,
+            "parsed": parsed,
+            "text": text,
+            "schema_errors": schema_errors or [],
+            "fetched_at": time.time(),
+        })
+
+    def flush(self) -> None:
+        """Block until every queued write has been committed."""
+        self._queue.join()
+        self._raise_writer_error()
+
+    def close(self) -> None:
+        """Commit pending writes and close the store."""
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        self._conn.close()
+        self._raise_writer_error()
+
+    def _raise_writer_error(self) -> None:
+        if self._error is not None:
+            raise RuntimeError(f"Crawl store writer failed: {self._error}") from self._error
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        try:
+            stopping = False
+            while not stopping:
+                batch = []
+                try:
+                    item = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    continue
+                if item is None:
+                    self._queue.task_done()
+                    break
+                batch.append(item)
+                while len(batch) < self.batch_size:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        self._queue.task_done()
+                        stopping = True
+                        break
+                    batch.append(item)
+
+                try:
+                    with conn:
+                        for record in batch:
+                            self._write_page(conn, record)
+                except BaseException as e:
+                    self._error = e
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+        finally:
+            conn.close()
+
+    def _write_page(self, conn: sqlite3.Connection, record: dict) -> None:
+        url = record["url"]
+        fetch = record["fetch"]
+        content = fetch.get("content")
+        body = zlib.compress(content.encode("utf-8", errors="replace")) if content is not None else None
+
+        if body is None:
+            # Failed fetch: record status and error but keep the last good body and parse
+            conn.execute(
+                """
+                INSERT INTO pages (url, final_url, status_code, headers, fetched_at, error)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    status_code = excluded.status_code,
+                    fetched_at = excluded.fetched_at,
+                    error = excluded.error
+                """,
+                (url, fetch.get("url"), fetch.get("status_code"), json.dumps(fetch.get("headers") or {}),
+                 record["fetched_at"], fetch.get("error")),
+            )
+            return
+
+        digest = content_hash(content)
+        conn.execute(
+            """
+            INSERT INTO pages (url, final_url, status_code, headers, body, content_hash, fetched_at, error)
+            VALUES (?, ?, ?, ?, ?, ?, ?, NULL)
+            ON CONFLICT(url) DO UPDATE SET
+                final_url = excluded.final_url,
+                status_code = excluded.status_code,
+                headers = excluded.headers,
+                body = excluded.body,
+                content_hash = excluded.content_hash,
+                fetched_at = excluded.fetched_at,
+                error = NULL
+            """,
+            (url, fetch.get("url"), fetch.get("status_code"), json.dumps(fetch.get("headers") or {}),
+             body, digest, record["fetched_at"]),
+        )
+
+        parsed = record["parsed"]
+        if parsed is None:
+            return
+
+        row = conn.execute("SELECT stats FROM parse_results WHERE url = ?", (url,)).fetchone()
+        old_stats = json.loads(row["stats"]) if row else {}
+        new_stats = page_stats(parsed, record["schema_errors"])
+
+        conn.execute("DELETE FROM links WHERE page = ?", (url,))
+        conn.execute("DELETE FROM images WHERE page = ?", (url,))
+        conn.executemany(
+            "INSERT INTO links (page, href, internal, text, rel) VALUES (?, ?, ?, ?, ?)",
+            [
+                (url, link["href"], int(kind == "internal"), link["text"], json.dumps(link["rel"]))
+                for kind in ("internal", "external")
+                for link in parsed["links"][kind]
+            ],
+        )
+        conn.executemany(
+            "INSERT INTO images (page, src, alt, width, height, loading) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (url, img["src"], img["alt"], img["width"], img["height"], img["loading"])
+                for img in parsed["images"]
+                if img["src"]
+            ],
+        )
+        text = record["text"]
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO parse_results (url, content_hash, data, text, schema_errors, stats, parsed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (url, digest, json.dumps(parsed), zlib.compress(text.encode("utf-8")) if text is not None else None,
+             json.dumps(record["schema_errors"]), json.dumps(new_stats), time.time()),
+        )
+
+        deltas = [
+            (key, new_stats.get(key, 0) - old_stats.get(key, 0))
+            for key in set(new_stats) | set(old_stats)
+        ]
+        conn.executemany(
+            """
+            INSERT INTO site_stats (key, value) VALUES (?, ?)
+            ON CONFLICT(key) DO UPDATE SET value = value + excluded.value
+            """,
+            [(key, delta) for key, delta in deltas if delta],
+        )
+
+    # Reads
+
+    def parsed_hashes(self) -> Dict[str, str]:
+        """Return url -> content hash that the stored parse result was built from."""
+        rows = self._conn.execute("SELECT url, content_hash FROM parse_results")
+        return {row["url"]: row["content_hash"] for row in rows}
+
+    def iter_word_counts(self) -> Iterator[tuple]:
+        """Yield (url, content_hash, word_count) for every parsed page."""
+        rows = self._conn.execute(
+            "SELECT url, content_hash, json_extract(data, '$.word_count') FROM parse_results ORDER BY url"
+        )
+        for row in rows:
+            yield row[0], row[1], row[2]
+
+    def iter_pages(self) -> Iterator[dict]:
+        """
+        Yield every stored page with its parse result.
+
+        Yields:
+            Dictionary with url, final_url, status_code, error and parsed
+            (the parse_html result, or None if the page was never parsed)
+        """
+        rows = self._conn.execute(
+            """
+            SELECT p.url, p.final_url, p.status_code, p.error, r.data
+            FROM pages p LEFT JOIN parse_results r ON r.url = p.url
+            ORDER BY p.url
+            """
+        )
+        for row in rows:
+            yield {
+                "url": row["url"],
+                "final_url": row["final_url"],
+                "status_code": row["status_code"],
+                "error": row["error"],
+                "parsed": json.loads(row["data"]) if row["data"] else None,
+            }
+
+    def get_body(self, url: str) -> Optional[str]:
+        """Return the stored HTML body for ``url``."""
+        row = self._conn.execute("SELECT body FROM pages WHERE url = ?", (url,)).fetchone()
+        if not row or row["body"] is None:
+            return None
+        return zlib.decompress(row["body"]).decode("utf-8")
+
+    def get_text(self, url: str) -> Optional[str]:
+        """Return the stored visible text for ``url`` (what word_count counts)."""
+        row = self._conn.execute("SELECT text FROM parse_results WHERE url = ?", (url,)).fetchone()
+        if not row or row["text"] is None:
+            return None
+        return zlib.decompress(row["text"]).decode("utf-8")
+
+    def site_stats(self) -> dict:
+        """Return site-level aggregates plus page counts by status code."""
+        stats = {row["key"]: row["value"] for row in self._conn.execute("SELECT key, value FROM site_stats")}
+        stats["pages"] = self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+        stats["fetch_errors"] = self._conn.execute(
+            "SELECT COUNT(*) FROM pages WHERE error IS NOT NULL"
+        ).fetchone()[0]
+        stats["status_codes"] = {
+            str(row["status_code"]): row["n"]
+            for row in self._conn.execute(
+                "SELECT status_code, COUNT(*) AS n FROM pages WHERE status_code IS NOT NULL GROUP BY status_code"
+            )
+        }
+        return stats
+
+
+def crawl(
+    store: CrawlStore,
+    urls: List[str],
+    workers: int = 5,
+    timeout: int = 30,
+    force: bool = False,
+) -> dict:
+    """
+    Fetch URLs concurrently into the store, re-parsing only changed pages.
+
+    Args:
+        store: Open CrawlStore
+        urls: URLs to fetch
+        workers: Number of concurrent fetchers
+        timeout: Per-request timeout in seconds
+        force: Re-parse every page even if its content hash is unchanged
+
+    Returns:
+        Dictionary with counts of parsed, unchanged and failed pages
+    """
+    from fetch_page import create_session, fetch_page
+    from parse_html import parse_html
+    from schema_hook import load_schema_validator
+
+    try:
+        validator = load_schema_validator()
+    except FileNotFoundError:
+        validator = None
+
+    known = {} if force else store.parsed_hashes()
+    session = create_session(pool_size=workers)
+
+    def work(url: str) -> str:
+        result = fetch_page(url, timeout=timeout, session=session)
+        if result["error"] or result["content"] is None:
+            store.put_page(url, result)
+            return "failed"
+
+        if known.get(url) == content_hash(result["content"]):
+            store.put_page(url, result)
+            return "unchanged"
+
+        parsed = parse_html(result["content"], result["url"], include_text=True)
+        text = parsed.pop("text")
+        parsed.pop("full_text")
+        errors = validator.validate_jsonld(result["content"]) if validator else []
+        store.put_page(url, result, parsed=parsed, text=text, schema_errors=errors)
+        return "parsed"
+
+    summary = {"parsed": 0, "unchanged": 0, "failed": 0}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for outcome in pool.map(work, urls):
+            summary[outcome] += 1
+
+    store.flush()
+    return summary
+
+
+def read_urls(path: str) -> List[str]:
+    """Read one URL per line, skipping blanks and # comments ('-' reads stdin)."""
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        real_path = os.path.realpath(path)
+        if not os.path.isfile(real_path):
+            print(f"Error: File not found: {path}", file=sys.stderr)
+            sys.exit(1)
+        with open(real_path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+
+    seen = set()
+    urls = []
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#") and line not in seen:
+            seen.add(line)
+            urls.append(line)
+    return urls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite crawl store with incremental re-audit")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    crawl_parser = sub.add_parser("crawl", help="Fetch URLs into the store")
+    crawl_parser.add_argument("db", help="SQLite database path")
+    crawl_parser.add_argument("urls", help="File with one URL per line ('-' for stdin)")
+    crawl_parser.add_argument("--workers", "-w", type=int, default=5, help="Concurrent fetchers")
+    crawl_parser.add_argument("--timeout", "-t", type=int, default=30, help="Timeout in seconds")
+    crawl_parser.add_argument("--force", action="store_true", help="Re-parse unchanged pages")
+
+    stats_parser = sub.add_parser("stats", help="Show site-level aggregates")
+    stats_parser.add_argument("db", help="SQLite database path")
+    stats_parser.add_argument("--json", "-j", action="store_true", help="Output as JSON")
+
+    args = parser.parse_args()
+
+    if args.command == "crawl":
+        urls = read_urls(args.urls)
+        with CrawlStore(args.db) as store:
+            summary = crawl(store, urls, workers=args.workers, timeout=args.timeout, force=args.force)
+        print(f"Crawled {len(urls)} URLs: {summary['parsed']} parsed, "
+              f"{summary['unchanged']} unchanged, {summary['failed']} failed")
+        return
+
+    if not os.path.isfile(args.db):
+        print(f"Error: Database not found: {args.db}", file=sys.stderr)
+        sys.exit(1)
+
+    with CrawlStore(args.db) as store:
+        stats = store.site_stats()
+
+    if args.json:
+        print(json.dumps(stats, indent=2))
+    else:
+        print(f"Pages: {stats['pages']} ({stats['fetch_errors']} fetch errors)")
+        print(f"Status Codes: {', '.join(f'{k}={v}' for k, v in sorted(stats['status_codes'].items()))}")
+        for key in sorted(k for k in stats if k not in ("pages", "fetch_errors", "status_codes")):
+            print(f"{key.replace('_', ' ').title()}: {stats[key]}")
+
+
+if __name__ == "__main__":
+    main()
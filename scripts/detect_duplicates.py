@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Detect near-duplicate and thin content across a crawl.
+
+Each page's visible text (the text parse_html counts words on) is split into
+word shingles and reduced to a MinHash signature computed with NumPy. The
+signatures go into a banded LSH index, so candidate duplicates come from
+bucket collisions instead of pairwise comparison, and new pages can be
+inserted incrementally. Signatures are cached in the crawl store keyed by
+content hash, so a re-audit only re-hashes pages that changed.
+
+Usage:
+    python detect_duplicates.py crawl.db
+    python detect_duplicates.py crawl.db --threshold 0.9 --min-words 400 --json
+    python detect_duplicates.py --jsonl pages.jsonl
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import zlib
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    print("Error: numpy required. Install with: pip install numpy")
+    sys.exit(1)
+
+
+# Lowest per-page minimum in seo/references/quality-gates.md (product, category, about)
+DEFAULT_MIN_WORDS = 400
+
+# Universal hashing modulus; (a * x + b) stays below 2**63 for 32-bit x
+_PRIME = np.uint64((1 << 31) - 1)
+
+SIGNATURE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS minhash (
+    url TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    num_perm INTEGER NOT NULL,
+    signature BLOB
+);
+"""
+
+
+def shingle_hashes(text: str, k: int = 5) -> "np.ndarray":
+    """
+    Hash the k-word shingles of ``text`` to 32-bit integers.
+
+    Texts shorter than k words become a single shingle; empty texts give an
+    empty array.
+    """
+    words = re.findall(r"\b\w+\b", text.lower())
+    if not words:
+        return np.empty(0, dtype=np.uint64)
+    if len(words) <= k:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+    return np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) for s in shingles),
+        dtype=np.uint64,
+        count=len(shingles),
+    )
+
+
+class MinHasher:
+    """MinHash signatures using ``num_perm`` seeded universal hash functions."""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._a = rng.integers(1, int(_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_PRIME), size=num_perm, dtype=np.uint64)
+
+    def signature(self, hashes: "np.ndarray") -> Optional["np.ndarray"]:
+        """Return the signature for a shingle-hash array, or None if it is empty."""
+        if hashes.size == 0:
+            return None
+        # (num_perm, n_shingles) matrix of permuted hashes; min over shingles
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % _PRIME
+        return permuted.min(axis=1).astype(np.uint32)
+
+
+def estimate_similarity(sig_a: "np.ndarray", sig_b: "np.ndarray") -> float:
+    """Estimate Jaccard similarity as the fraction of matching signature slots."""
+    return float(np.count_nonzero(sig_a == sig_b)) / sig_a.size
+
+
+class LSHIndex:
+    """
+    Banded locality-sensitive hashing over MinHash signatures.
+
+    Pages collide in a band bucket when all ``rows`` slots of that band match.
+    With 16 bands of 8 rows (128 permutations) pairs above ~0.7 Jaccard are
+    very likely to collide at least once.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 16):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._buckets: Dict[Tuple[int, bytes], List[str]] = defaultdict(list)
+        self.signatures: Dict[str, "np.ndarray"] = {}
+
+    def _bucket_keys(self, signature: "np.ndarray") -> List[Tuple[int, bytes]]:
+        return [
+            (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def query(self, signature: "np.ndarray") -> List[str]:
+        """Return the indexed keys that share at least one band bucket with ``signature``."""
+        candidates = set()
+        for bucket in self._bucket_keys(signature):
+            candidates.update(self._buckets.get(bucket, ()))
+        return sorted(candidates)
+
+    def add(self, key: str, signature: "np.ndarray", find: Optional[Callable[[str], str]] = None) -> None:
+        """
+        Index a signature.
+
+        When ``find`` maps keys to cluster roots, the key is not appended to
+        buckets that already hold a member of its cluster, so buckets grow
+        with the number of distinct clusters rather than pages.
+        """
+        root = find(key) if find else None
+        for bucket in self._bucket_keys(signature):
+            members = self._buckets[bucket]
+            if find and any(find(member) == root for member in members):
+                continue
+            members.append(key)
+        self.signatures[key] = signature
+
+    def insert(self, key: str, signature: "np.ndarray") -> List[str]:
+        """
+        Add a signature and return the keys already in the index it collides with.
+        """
+        candidates = [other for other in self.query(signature) if other != key]
+        self.add(key, signature)
+        return candidates
+
+
+class DuplicateDetector:
+    """Incremental near-duplicate clustering on top of MinHash + LSH."""
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, bands: int = 16, shingle_size: int = 5):
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.hasher = MinHasher(num_perm=num_perm)
+        self.index = LSHIndex(num_perm=num_perm, bands=bands)
+        self._parent: Dict[str, str] = {}
+        # Cluster root -> lowest similarity of any merge into that cluster
+        self._min_similarity: Dict[str, float] = {}
+
+    def signature(self, text: str) -> Optional["np.ndarray"]:
+        return self.hasher.signature(shingle_hashes(text, self.shingle_size))
+
+    def add(self, key: str, text: Optional[str] = None, signature: Optional["np.ndarray"] = None) -> List[dict]:
+        """
+        Insert one page and return the near-duplicate clusters it joined.
+
+        Candidates are grouped by cluster root and the page joins a cluster
+        through its most similar candidate member. Buckets hold at most one
+        member per cluster, so each cluster contributes at most ``bands``
+        candidates however large it grows.
+
+        Args:
+            key: Page URL
+            text: Visible page text (ignored when ``signature`` is given)
+            signature: Precomputed MinHash signature
+
+        Returns:
+            List of {url, similarity}, one per matched cluster, where url is
+            the most similar candidate member of that cluster
+        """
+        if signature is None:
+            signature = self.signature(text or "")
+        if signature is None:
+            return []
+
+        self._parent.setdefault(key, key)
+        by_root: Dict[str, List[str]] = defaultdict(list)
+        for other in self.index.query(signature):
+            if other != key:
+                by_root[self._find(other)].append(other)
+
+        matches = []
+        for members in by_root.values():
+            similarity, best = max(
+                (estimate_similarity(signature, self.index.signatures[other]), other) for other in members
+            )
+            if similarity >= self.threshold:
+                matches.append({"url": best, "similarity": round(similarity, 3)})
+                self._union(key, best, similarity)
+
+        self.index.add(key, signature, find=self._find)
+        return matches
+
+    def _find(self, x: str) -> str:
+        root = x
+        while self._parent[root] != root:
+            root = self._parent[root]
+        while self._parent[x] != root:
+            self._parent[x], x = root, self._parent[x]
+        return root
+
+    def _union(self, a: str, b: str, similarity: float) -> None:
+        ra, rb = self._find(a), self._find(b)
+        lowest = min(
+            similarity,
+            self._min_similarity.pop(ra, 1.0),
+            self._min_similarity.pop(rb, 1.0),
+        )
+        if ra != rb:
+            self._parent[rb] = ra
+        self._min_similarity[ra] = lowest
+
+    def clusters(self) -> List[dict]:
+        """Return clusters of two or more near-duplicate pages, largest first."""
+        groups: Dict[str, List[str]] = defaultdict(list)
+        for key in self._parent:
+            groups[self._find(key)].append(key)
+
+        result = []
+        for root, urls in groups.items():
+            if len(urls) > 1:
+                result.append({
+                    "urls": sorted(urls),
+                    "size": len(urls),
+                    "min_similarity": round(self._min_similarity.get(root, 1.0), 3),
+                })
+        result.sort(key=lambda c: (-c["size"], c["urls"][0]))
+        return result
+
+
+def detect_duplicates(
+    pages: Iterable[dict],
+    threshold: float = 0.8,
+    min_words: int = DEFAULT_MIN_WORDS,
+    detector: Optional[DuplicateDetector] = None,
+) -> dict:
+    """
+    Find near-duplicate clusters and thin pages.
+
+    Args:
+        pages: Records with url, word_count and either text or a precomputed
+            signature (NumPy uint32 array)
+        threshold: Minimum estimated Jaccard similarity for a duplicate
+        min_words: Pages below this word count are reported as thin
+        detector: Existing detector to extend incrementally
+
+    Returns:
+        Dictionary with clusters, thin_pages and summary counts
+    """
+    detector = detector or DuplicateDetector(threshold=threshold)
+    thin_pages = []
+    total = 0
+
+    for page in pages:
+        total += 1
+        detector.add(page["url"], text=page.get("text"), signature=page.get("signature"))
+        word_count = page.get("word_count")
+        if word_count is not None and word_count < min_words:
+            thin_pages.append({"url": page["url"], "word_count": word_count})
+
+    clusters = detector.clusters()
+    thin_pages.sort(key=lambda p: p["word_count"])
+    return {
+        "clusters": clusters,
+        "thin_pages": thin_pages,
+        "summary": {
+            "pages": total,
+            "duplicate_clusters": len(clusters),
+            "pages_in_clusters": sum(c["size"] for c in clusters),
+            "thin_pages": len(thin_pages),
+        },
+    }
+
+
+def iter_store_pages(db_path: str, detector: DuplicateDetector) -> Iterable[dict]:
+    """
+    Yield crawl store pages with MinHash signatures, computing only stale ones.
+
+    Signatures are cached in a ``minhash`` table keyed by the content hash of
+    the parse result they were built from.
+    """
+    from crawl_store import CrawlStore
+
+    num_perm = detector.hasher.num_perm
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.executescript(SIGNATURE_SCHEMA)
+    cached = {
+        url: (content_hash, signature)
+        for url, content_hash, signature in conn.execute(
+            "SELECT url, content_hash, signature FROM minhash WHERE num_perm = ?", (num_perm,)
+        )
+    }
+
+    pending = []
+    with CrawlStore(db_path) as store:
+        for url, content_hash, word_count in list(store.iter_word_counts()):
+            hit = cached.get(url)
+            if hit and hit[0] == content_hash:
+                signature = np.frombuffer(hit[1], dtype=np.uint32) if hit[1] is not None else None
+            else:
+                signature = detector.signature(store.get_text(url) or "")
+                pending.append((
+                    url, content_hash, num_perm,
+                    signature.tobytes() if signature is not None else None,
+                ))
+            yield {"url": url, "word_count": word_count, "signature": signature}
+
+    with conn:
+        conn.executemany("INSERT OR REPLACE INTO minhash VALUES (?, ?, ?, ?)", pending)
+    conn.close()
+
+
+def _read_jsonl(path: str) -> Iterable[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                if "word_count" not in record and "text" in record:
+                    record["word_count"] = len(re.findall(r"\b\w+\b", record["text"]))
+                yield record
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detect near-duplicate and thin content")
+    parser.add_argument("db", nargs="?", help="Crawl store database (from crawl_store.py)")
+    parser.add_argument("--jsonl", help="JSON lines file of {url, text} records")
+    parser.add_argument("--threshold", type=float, default=0.8, help="Jaccard similarity for duplicates")
+    parser.add_argument("--min-words", type=int, default=DEFAULT_MIN_WORDS, help="Thin content threshold")
+    parser.add_argument("--json", "-j", action="store_true", help="Output as JSON")
+
+    args = parser.parse_args()
+
+    source = args.jsonl or args.db
+    if not source:
+        parser.error("a crawl store database or --jsonl file is required")
+    real_path = os.path.realpath(source)
+    if not os.path.isfile(real_path):
+        print(f"Error: File not found: {source}", file=sys.stderr)
+        sys.exit(1)
+
+    detector = DuplicateDetector(threshold=args.threshold)
+    pages = _read_jsonl(real_path) if args.jsonl else iter_store_pages(real_path, detector)
+    result = detect_duplicates(pages, min_words=args.min_words, detector=detector)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        summary = result["summary"]
+        print(f"Pages: {summary['pages']}")
+        print(f"Duplicate Clusters: {summary['duplicate_clusters']} ({summary['pages_in_clusters']} pages)")
+        print(f"Thin Pages (<{args.min_words} words): {summary['thin_pages']}")
+        for cluster in result["clusters"][:20]:
+            print(f"\n  {cluster['size']} pages, similarity >= {cluster['min_similarity']}:")
+            for url in cluster["urls"][:5]:
+                print(f"    {url}")
+            if cluster["size"] > 5:
+                print(f"    ... {cluster['size'] - 5} more")
+
+
+if __name__ == "__main__":
+    main()
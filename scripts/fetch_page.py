@@ -5,6 +5,8 @@ Fetch a web page with proper headers and error handling.
 Usage:
     python fetch_page.py https://example.com
     python fetch_page.py https://example.com --output page.html
+    python fetch_page.py https://example.com --trace trace.json
+    python fetch_page.py https://example.com --profile fetch.prof
 """
 
 import argparse
@@ -14,6 +16,8 @@ import sys
 from typing import Optional
 from urllib.parse import urlparse
 
+from stage_timing import StageTimer, run_profiled, write_chrome_trace
+
 try:
     import requests
 except ImportError:
@@ -30,11 +34,47 @@ DEFAULT_HEADERS = {
 }
 
 
+def create_session(pool_size: int = 10) -> requests.Session:
+    """
+    Create a session whose connection pool can serve concurrent fetchers.
+
+    Args:
+        pool_size: Maximum connections kept open per host
+
+    Returns:
+        A requests.Session to pass to fetch_page(session=...)
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def blocked_reason(hostname: Optional[str]) -> Optional[str]:
+    """
+    SSRF check: return an error message if ``hostname`` resolves to a
+    private/internal IP, otherwise None.
+
+    DNS resolution failures return None and are left to the HTTP request.
+    """
+    try:
+        resolved_ip = socket.gethostbyname(hostname)
+        ip = ipaddress.ip_address(resolved_ip)
+        if ip.is_private or ip.is_loopback or ip.is_reserved:
+            return f"Blocked: URL resolves to private/internal IP ({resolved_ip})"
+    except (socket.gaierror, ValueError, TypeError, UnicodeError):
+        pass
+    return None
+
+
 def fetch_page(
     url: str,
     timeout: int = 30,
     follow_redirects: bool = True,
     max_redirects: int = 5,
+    trace: bool = False,
+    session: Optional[requests.Session] = None,
 ) -> dict:
     """
     Fetch a web page and return response details.
@@ -44,6 +84,8 @@ def fetch_page(
         timeout: Request timeout in seconds
         follow_redirects: Whether to follow redirects
         max_redirects: Maximum number of redirects to follow
+        trace: Record per-stage timing spans (dns, connect_ttfb, download, decode)
+        session: Reuse an existing session (keeps connections warm across calls)
 
     Returns:
         Dictionary with:
@@ -53,6 +95,7 @@ def fetch_page(
             - headers: Response headers
             - redirect_chain: List of redirect URLs
             - error: Error message if failed
+            - timings: List of timing spans (only when trace=True)
     """
     result = {
         "url": url,
@@ -62,6 +105,9 @@ def fetch_page(
         "redirect_chain": [],
         "error": None,
     }
+    timer = StageTimer(enabled=trace, category="fetch")
+    if trace:
+        result["timings"] = timer.spans
 
     # Validate URL
     parsed = urlparse(url)
@@ -74,29 +120,35 @@ def fetch_page(
         return result
 
     # SSRF prevention: block private/internal IPs
-    try:
-        resolved_ip = socket.gethostbyname(parsed.hostname)
-        ip = ipaddress.ip_address(resolved_ip)
-        if ip.is_private or ip.is_loopback or ip.is_reserved:
-            result["error"] = f"Blocked: URL resolves to private/internal IP ({resolved_ip})"
-            return result
-    except (socket.gaierror, ValueError):
-        pass  # DNS resolution failure handled by requests below
+    with timer.stage("dns", host=parsed.hostname):
+        blocked = blocked_reason(parsed.hostname)
+    if blocked:
+        result["error"] = blocked
+        return result
 
     try:
-        session = requests.Session()
+        if session is None:
+            session = requests.Session()
         session.max_redirects = max_redirects
 
-        response = session.get(
-            url,
-            headers=DEFAULT_HEADERS,
-            timeout=timeout,
-            allow_redirects=follow_redirects,
-        )
+        # Stream so that connect/TLS/TTFB and body download time separately
+        with timer.stage("connect_ttfb", url=url):
+            response = session.get(
+                url,
+                headers=DEFAULT_HEADERS,
+                timeout=timeout,
+                allow_redirects=follow_redirects,
+                stream=True,
+            )
+
+        with timer.stage("download"):
+            body = response.content
+        with timer.stage("decode", bytes=len(body)):
+            content = response.text
 
         result["url"] = response.url
         result["status_code"] = response.status_code
-        result["content"] = response.text
+        result["content"] = content
         result["headers"] = dict(response.headers)
 
         # Track redirect chain
@@ -123,14 +175,23 @@ def main():
     parser.add_argument("--output", "-o", help="Output file path")
     parser.add_argument("--timeout", "-t", type=int, default=30, help="Timeout in seconds")
     parser.add_argument("--no-redirects", action="store_true", help="Don't follow redirects")
+    parser.add_argument("--trace", help="Write per-stage timings as Chrome trace JSON to this file")
+    parser.add_argument("--profile", help="Run under cProfile and write stats to this file")
 
     args = parser.parse_args()
 
-    result = fetch_page(
-        args.url,
-        timeout=args.timeout,
-        follow_redirects=not args.no_redirects,
-    )
+    kwargs = {
+        "timeout": args.timeout,
+        "follow_redirects": not args.no_redirects,
+        "trace": bool(args.trace),
+    }
+    if args.profile:
+        result = run_profiled(args.profile, fetch_page, args.url, **kwargs)
+    else:
+        result = fetch_page(args.url, **kwargs)
+
+    if args.trace:
+        write_chrome_trace(result["timings"], args.trace)
 
     if result["error"]:
         print(f"Error: {result['error']}", file=sys.stderr)
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Collect lab Core Web Vitals (LCP, CLS, TBT as the INP proxy) with Playwright.
+
+One Chromium instance is reused for every URL; each run gets a fresh browser
+context (cold cache) with PerformanceObserver hooks injected before any page
+script runs. URLs are measured with bounded parallelism, repeated N times,
+and reported as p50/p75 per metric with a long-task breakdown. Optional CPU
+and network throttling is applied through the Chrome DevTools Protocol.
+
+Lab numbers are for debugging and template comparison; Google ranks on field
+data (see seo/references/cwv-thresholds.md).
+
+Usage:
+    python measure_cwv.py https://example.com
+    python measure_cwv.py --urls urls.txt --runs 5 --parallel 4 --throttle mobile
+    python measure_cwv.py https://example.com --interact --json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+from collections import defaultdict
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+try:
+    from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
+except ImportError:
+    print("Error: playwright required. Install with: pip install playwright && playwright install chromium")
+    sys.exit(1)
+
+from fetch_page import blocked_reason
+
+# Throttling profiles. "mobile" matches Lighthouse's simulated slow 4G + 4x CPU.
+PROFILES = {
+    "none": {
+        "viewport": {"width": 1920, "height": 1080},
+        "is_mobile": False,
+        "cpu_rate": 1,
+        "network": None,
+    },
+    "desktop": {
+        "viewport": {"width": 1350, "height": 940},
+        "is_mobile": False,
+        "cpu_rate": 1,
+        "network": {"latency": 40, "download_kbps": 10240, "upload_kbps": 10240},
+    },
+    "mobile": {
+        "viewport": {"width": 412, "height": 823},
+        "is_mobile": True,
+        "cpu_rate": 4,
+        "network": {"latency": 150, "download_kbps": 1638, "upload_kbps": 750},
+    },
+}
+
+# (good, poor) boundaries from seo/references/cwv-thresholds.md; TBT uses Lighthouse's
+THRESHOLDS = {
+    "lcp_ms": (2500, 4000),
+    "cls": (0.1, 0.25),
+    "inp_ms": (200, 500),
+    "tbt_ms": (200, 600),
+    "fcp_ms": (1800, 3000),
+    "ttfb_ms": (800, 1800),
+}
+
+OBSERVER_SCRIPT = """
+(() => {
+  const cwv = window.__cwv = {
+    lcp: null, lcpElement: null, fcp: null, ttfb: null,
+    cls: 0, longTasks: [], interactions: {}
+  };
+  const observe = (type, callback, options = {}) => {
+    try {
+      new PerformanceObserver((list) => list.getEntries().forEach(callback))
+        .observe(Object.assign({type, buffered: true}, options));
+    } catch (e) { /* entry type not supported */ }
+  };
+
+  observe('largest-contentful-paint', (e) => {
+    cwv.lcp = e.startTime;
+    cwv.lcpElement = e.element ? e.element.tagName.toLowerCase() : null;
+    cwv.lcpUrl = e.url || null;
+  });
+
+  observe('paint', (e) => {
+    if (e.name === 'first-contentful-paint') cwv.fcp = e.startTime;
+  });
+
+  // CLS: largest session window (gap < 1s, window <= 5s), ignoring shifts after input
+  let sessionValue = 0, sessionStart = 0, lastShift = 0;
+  observe('layout-shift', (e) => {
+    if (e.hadRecentInput) return;
+    if (sessionValue && e.startTime - lastShift < 1000 && e.startTime - sessionStart < 5000) {
+      sessionValue += e.value;
+    } else {
+      sessionValue = e.value;
+      sessionStart = e.startTime;
+    }
+    lastShift = e.startTime;
+    cwv.cls = Math.max(cwv.cls, sessionValue);
+  });
+
+  observe('longtask', (e) => {
+    const attribution = (e.attribution && e.attribution[0]) || {};
+    cwv.longTasks.push({
+      start: e.startTime,
+      duration: e.duration,
+      source: attribution.containerSrc || attribution.containerName || e.name || 'unknown'
+    });
+  });
+
+  // INP: worst interaction latency, grouping event entries by interactionId
+  observe('event', (e) => {
+    if (!e.interactionId) return;
+    const prev = cwv.interactions[e.interactionId] || 0;
+    cwv.interactions[e.interactionId] = Math.max(prev, e.duration);
+  }, {durationThreshold: 16});
+
+  observe('navigation', (e) => { cwv.ttfb = e.responseStart; });
+})();
+"""
+
+COLLECT_SCRIPT = """
+() => {
+  const cwv = window.__cwv || {};
+  const latencies = Object.values(cwv.interactions || {});
+  return {
+    lcp: cwv.lcp, lcpElement: cwv.lcpElement, lcpUrl: cwv.lcpUrl || null,
+    fcp: cwv.fcp, ttfb: cwv.ttfb, cls: cwv.cls || 0,
+    longTasks: cwv.longTasks || [],
+    inp: latencies.length ? Math.max(...latencies) : null
+  };
+}
+"""
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Linear-interpolated percentile of ``values`` (pct in 0-100)."""
+    values = sorted(v for v in values if v is not None)
+    if not values:
+        return None
+    rank = (len(values) - 1) * pct / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+
+def rate(metric: str, value: Optional[float]) -> Optional[str]:
+    """Rate a value as good / needs-improvement / poor."""
+    if value is None or metric not in THRESHOLDS:
+        return None
+    good, poor = THRESHOLDS[metric]
+    if value <= good:
+        return "good"
+    return "needs-improvement" if value <= poor else "poor"
+
+
+def total_blocking_time(long_tasks: List[dict], fcp: Optional[float]) -> float:
+    """Sum of long-task time beyond 50ms after first contentful paint."""
+    start = fcp or 0
+    return sum(max(0.0, t["duration"] - 50) for t in long_tasks if t["start"] >= start)
+
+
+async def _apply_throttling(context, page, profile: dict) -> None:
+    if profile["cpu_rate"] <= 1 and not profile["network"]:
+        return
+    cdp = await context.new_cdp_session(page)
+    if profile["cpu_rate"] > 1:
+        await cdp.send("Emulation.setCPUThrottlingRate", {"rate": profile["cpu_rate"]})
+    if profile["network"]:
+        net = profile["network"]
+        await cdp.send("Network.enable")
+        await cdp.send("Network.emulateNetworkConditions", {
+            "offline": False,
+            "latency": net["latency"],
+            "downloadThroughput": net["download_kbps"] * 1024 / 8,
+            "uploadThroughput": net["upload_kbps"] * 1024 / 8,
+        })
+
+
+async def measure_once(browser, url: str, profile: dict, timeout: int, settle_ms: int, interact: bool) -> dict:
+    """Load ``url`` once in a fresh context and return raw metrics."""
+    context = await browser.new_context(
+        viewport=profile["viewport"],
+        is_mobile=profile["is_mobile"],
+        has_touch=profile["is_mobile"],
+    )
+    try:
+        page = await context.new_page()
+        await page.add_init_script(OBSERVER_SCRIPT)
+        await _apply_throttling(context, page, profile)
+
+        await page.goto(url, wait_until="load", timeout=timeout)
+        await page.wait_for_timeout(settle_ms)
+
+        if interact:
+            # A keyboard interaction produces event-timing entries without navigating away
+            await page.keyboard.press("Tab")
+            await page.wait_for_timeout(500)
+
+        raw = await page.evaluate(COLLECT_SCRIPT)
+    finally:
+        await context.close()
+
+    tbt = total_blocking_time(raw["longTasks"], raw["fcp"])
+    return {
+        "lcp_ms": raw["lcp"],
+        "lcp_element": raw["lcpElement"],
+        "lcp_url": raw["lcpUrl"],
+        "cls": round(raw["cls"], 4),
+        "tbt_ms": round(tbt, 1),
+        "inp_ms": raw["inp"],
+        "fcp_ms": raw["fcp"],
+        "ttfb_ms": raw["ttfb"],
+        "long_tasks": raw["longTasks"],
+    }
+
+
+def summarize(url: str, runs: List[dict], errors: List[str]) -> dict:
+    """Aggregate repeated runs into p50/p75 per metric plus a long-task breakdown."""
+    metrics = {}
+    for metric in ("lcp_ms", "cls", "tbt_ms", "inp_ms", "fcp_ms", "ttfb_ms"):
+        values = [run[metric] for run in runs if run[metric] is not None]
+        if not values:
+            metrics[metric] = {"p50": None, "p75": None, "rating": None}
+            continue
+        p50, p75 = percentile(values, 50), percentile(values, 75)
+        digits = 4 if metric == "cls" else 1
+        metrics[metric] = {"p50": round(p50, digits), "p75": round(p75, digits), "rating": rate(metric, p75)}
+
+    buckets = {"50-100ms": 0, "100-250ms": 0, "250ms+": 0}
+    by_source: Dict[str, dict] = defaultdict(lambda: {"count": 0, "total_ms": 0.0})
+    task_count = 0
+    for run in runs:
+        for task in run["long_tasks"]:
+            task_count += 1
+            duration = task["duration"]
+            if duration < 100:
+                buckets["50-100ms"] += 1
+            elif duration < 250:
+                buckets["100-250ms"] += 1
+            else:
+                buckets["250ms+"] += 1
+            source = by_source[task["source"]]
+            source["count"] += 1
+            source["total_ms"] += duration
+
+    n = len(runs) or 1
+    sources = sorted(
+        ({"source": name, "count_per_run": round(s["count"] / n, 1), "ms_per_run": round(s["total_ms"] / n, 1)}
+         for name, s in by_source.items()),
+        key=lambda s: -s["ms_per_run"],
+    )
+    lcp_elements = sorted({run["lcp_element"] for run in runs if run["lcp_element"]})
+
+    return {
+        "url": url,
+        "runs": len(runs),
+        "metrics": metrics,
+        "lcp_elements": lcp_elements,
+        "long_tasks": {
+            "per_run": round(task_count / n, 1),
+            "duration_buckets": buckets,
+            "by_source": sources[:10],
+        },
+        "errors": errors,
+    }
+
+
+async def measure_urls(
+    urls: List[str],
+    runs: int = 3,
+    parallel: int = 2,
+    throttle: str = "none",
+    timeout: int = 30000,
+    settle_ms: int = 3000,
+    interact: bool = False,
+) -> List[dict]:
+    """
+    Measure every URL ``runs`` times over one shared browser.
+
+    Args:
+        urls: URLs to measure
+        runs: Repetitions per URL
+        parallel: Maximum URLs measured at once (runs of one URL are sequential)
+        throttle: Key of PROFILES (throttling and viewport)
+        timeout: Page load timeout in milliseconds
+        settle_ms: Wait after load so late LCP candidates and shifts are captured
+        interact: Press Tab after load to record an interaction for INP
+
+    Returns:
+        One summary dict per unique URL, in input order
+    """
+    if runs < 1 or parallel < 1:
+        raise ValueError(f"runs ({runs}) and parallel ({parallel}) must be at least 1")
+
+    # A repeated URL would get two concurrent measure_url coroutines
+    urls = list(dict.fromkeys(urls))
+    profile = PROFILES[throttle]
+    semaphore = asyncio.Semaphore(parallel)
+    results: Dict[str, List[dict]] = defaultdict(list)
+    errors: Dict[str, List[str]] = defaultdict(list)
+
+    allowed = []
+    for url in urls:
+        blocked = blocked_reason(urlparse(url).hostname)
+        if blocked:
+            errors[url].append(blocked)
+        else:
+            allowed.append(url)
+
+    async def measure_url(browser, url: str) -> None:
+        # Repeats of one URL run back to back so they never compete for CPU;
+        # parallelism applies across URLs only
+        async with semaphore:
+            for _ in range(runs):
+                try:
+                    results[url].append(await measure_once(browser, url, profile, timeout, settle_ms, interact))
+                except PlaywrightTimeout:
+                    errors[url].append(f"Page load timed out after {timeout}ms")
+                except Exception as e:
+                    errors[url].append(str(e))
+
+    if allowed:
+        async with async_playwright() as p:
+            try:
+                browser = await p.chromium.launch(headless=True)
+            except Exception as e:
+                for url in allowed:
+                    errors[url].append(f"Browser launch failed: {e}")
+            else:
+                try:
+                    await asyncio.gather(*(measure_url(browser, url) for url in allowed))
+                finally:
+                    await browser.close()
+
+    return [summarize(url, results[url], errors[url]) for url in urls]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Collect lab Core Web Vitals with Playwright")
+    parser.add_argument("url", nargs="?", help="URL to measure")
+    parser.add_argument("--urls", help="File with one URL per line")
+    parser.add_argument("--runs", "-n", type=int, default=3, help="Runs per URL")
+    parser.add_argument("--parallel", "-p", type=int, default=2, help="URLs measured at once")
+    parser.add_argument("--throttle", default="none", choices=PROFILES.keys(), help="Throttling profile")
+    parser.add_argument("--timeout", "-t", type=int, default=30000, help="Timeout in ms")
+    parser.add_argument("--settle", type=int, default=3000, help="Wait after load in ms")
+    parser.add_argument("--interact", action="store_true", help="Simulate a key press to measure INP")
+    parser.add_argument("--json", "-j", action="store_true", help="Output as JSON")
+
+    args = parser.parse_args()
+
+    urls = [args.url] if args.url else []
+    if args.urls:
+        real_path = os.path.realpath(args.urls)
+        if not os.path.isfile(real_path):
+            print(f"Error: File not found: {args.urls}", file=sys.stderr)
+            sys.exit(1)
+        with open(real_path, "r", encoding="utf-8") as f:
+            urls.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+    if not urls:
+        parser.error("a URL or --urls file is required")
+    if args.runs < 1:
+        parser.error("--runs must be at least 1")
+    if args.parallel < 1:
+        parser.error("--parallel must be at least 1")
+
+    results = asyncio.run(measure_urls(
+        urls,
+        runs=args.runs,
+        parallel=args.parallel,
+        throttle=args.throttle,
+        timeout=args.timeout,
+        settle_ms=args.settle,
+        interact=args.interact,
+    ))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    labels = {"lcp_ms": "LCP (ms)", "cls": "CLS", "tbt_ms": "TBT (ms)", "inp_ms": "INP (ms)",
+              "fcp_ms": "FCP (ms)", "ttfb_ms": "TTFB (ms)"}
+    for result in results:
+        print(f"\n{result['url']} ({result['runs']} runs, throttle: {args.throttle})")
+        print("=" * 40)
+        for metric, label in labels.items():
+            m = result["metrics"][metric]
+            if m["p50"] is None:
+                continue
+            print(f"  {label:<10} p50 {m['p50']:<9} p75 {m['p75']:<9} {m['rating']}")
+        tasks = result["long_tasks"]
+        print(f"  Long tasks/run: {tasks['per_run']} {tasks['duration_buckets']}")
+        for error in result["errors"]:
+            print(f"  Error: {error}")
+
+
+if __name__ == "__main__":
+    main()
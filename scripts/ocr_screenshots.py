@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+OCR captured screenshots for section-level visual analysis.
+
+Full-page screenshots are cut into overlapping tiles. Each tile is keyed by a
+SHA-256 digest of its pixels, so tiles identical to a previous capture are
+served from the cache and never re-OCR'd, while a change to a single glyph
+forces a fresh pass. Uncached tiles are sent in batches to a process pool,
+one RapidOCR (CPU ONNX) engine per worker.
+
+Text blocks come back with bounding boxes in page coordinates. Given the
+page HTML, blocks are matched against parse_html headings and page text to
+flag text that is rendered as an image (invisible to crawlers).
+
+Usage:
+    python ocr_screenshots.py screenshots/example_com_desktop.png
+    python ocr_screenshots.py screenshots/ --html page.html --json
+    python ocr_screenshots.py screenshots/ --workers 4 --cache ocr_cache.db
+"""
+
+import argparse
+import difflib
+import hashlib
+import io
+import json
+import os
+import re
+import sqlite3
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from PIL import Image
+except ImportError:
+    print("Error: Pillow required. Install with: pip install Pillow")
+    sys.exit(1)
+
+TILE_HEIGHT = 1600
+TILE_OVERLAP = 120
+
+# OCR lines at least this tall (px) are treated as heading-sized text
+HEADING_MIN_HEIGHT = 28
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ocr_blocks (
+    digest TEXT PRIMARY KEY,
+    blocks TEXT NOT NULL
+);
+"""
+
+_engine = None
+
+
+def tile_digest(tile: "Image.Image") -> str:
+    """
+    Exact cache key for a tile: SHA-256 of its RGB pixels plus its size.
+
+    Re-encoding the same capture keeps the key; any pixel change alters it.
+    """
+    return f"{hashlib.sha256(tile.tobytes()).hexdigest()}-{tile.width}x{tile.height}"
+
+
+def tile_image(image: "Image.Image", tile_height: int = TILE_HEIGHT, overlap: int = TILE_OVERLAP) -> List[Tuple[int, "Image.Image"]]:
+    """Split a tall screenshot into (y_offset, tile) pairs that overlap vertically."""
+    tiles = []
+    step = tile_height - overlap
+    y = 0
+    while True:
+        bottom = min(y + tile_height, image.height)
+        tiles.append((y, image.crop((0, y, image.width, bottom))))
+        if bottom >= image.height:
+            break
+        y += step
+    return tiles
+
+
+def _init_worker(threads: int) -> None:
+    global _engine
+    from rapidocr_onnxruntime import RapidOCR
+    # One ONNX thread per process; the pool provides the parallelism
+    _engine = RapidOCR(intra_op_num_threads=threads, inter_op_num_threads=1, rec_batch_num=16)
+
+
+def _ocr_batch(batch: List[Tuple[str, bytes]]) -> List[Tuple[str, List[dict]]]:
+    """Worker: OCR a batch of PNG-encoded tiles, returning tile-relative blocks."""
+    results = []
+    for key, png in batch:
+        detections, _ = _engine(png)
+        blocks = []
+        for box, text, score in detections or []:
+            xs = [point[0] for point in box]
+            ys = [point[1] for point in box]
+            blocks.append({
+                "text": text,
+                "confidence": round(float(score), 3),
+                "box": [int(min(xs)), int(min(ys)), int(max(xs)), int(max(ys))],
+            })
+        results.append((key, blocks))
+    return results
+
+
+class OCRCache:
+    """SQLite cache of OCR blocks keyed by tile pixel digest."""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(CACHE_SCHEMA)
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[dict]]:
+        found = {}
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            rows = self._conn.execute(
+                f"SELECT digest, blocks FROM ocr_blocks WHERE digest IN ({','.join('?' * len(chunk))})", chunk
+            )
+            found.update((key, json.loads(blocks)) for key, blocks in rows)
+        return found
+
+    def put_many(self, items: Dict[str, List[dict]]) -> None:
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO ocr_blocks (digest, blocks) VALUES (?, ?)",
+                [(key, json.dumps(blocks)) for key, blocks in items.items()],
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def _merge_blocks(tile_blocks: List[Tuple[int, int, List[dict]]], tolerance: int = 10) -> List[dict]:
+    """
+    Shift tile blocks to page coordinates and drop copies read twice in tile overlaps.
+
+    Args:
+        tile_blocks: (y_offset, tile height, tile-relative blocks) in page order
+        tolerance: Maximum position difference (px) between the two copies
+
+    Only blocks inside the band shared by consecutive tiles are compared, so
+    repeated labels elsewhere on the page (stacked "Add to cart" buttons) stay.
+    """
+    merged: List[dict] = []
+    previous: List[dict] = []
+    previous_bottom = 0
+    for y_offset, height, blocks in tile_blocks:
+        in_overlap = [other for other in previous if other["box"][1] >= y_offset]
+        current = []
+        for block in blocks:
+            x0, y0, x1, y1 = block["box"]
+            shifted = dict(block, box=[x0, y0 + y_offset, x1, y1 + y_offset])
+            current.append(shifted)
+            duplicate = shifted["box"][3] <= previous_bottom and any(
+                other["text"] == shifted["text"]
+                and abs(other["box"][0] - shifted["box"][0]) <= tolerance
+                and abs(other["box"][1] - shifted["box"][1]) <= tolerance
+                for other in in_overlap
+            )
+            if not duplicate:
+                merged.append(shifted)
+        previous, previous_bottom = current, y_offset + height
+    merged.sort(key=lambda b: (b["box"][1], b["box"][0]))
+    return merged
+
+
+def _encode_batch(batch: List[Tuple[str, str, int, int]], opened: Dict[str, "Image.Image"]) -> List[Tuple[str, bytes]]:
+    """
+    Re-crop and PNG-encode one batch of uncached tiles from their screenshots.
+
+    ``opened`` keeps the most recently decoded screenshot, since consecutive
+    misses usually come from the same file.
+    """
+    encoded = []
+    for key, path, y_offset, height in batch:
+        if path not in opened:
+            opened.clear()
+            with Image.open(path) as image:
+                opened[path] = image.convert("RGB")
+        image = opened[path]
+        buffer = io.BytesIO()
+        image.crop((0, y_offset, image.width, y_offset + height)).save(buffer, "PNG")
+        encoded.append((key, buffer.getvalue()))
+    return encoded
+
+
+def ocr_screenshots(
+    paths: List[str],
+    workers: int = 2,
+    batch_size: int = 4,
+    cache_path: Optional[str] = None,
+    tile_height: int = TILE_HEIGHT,
+) -> Dict[str, dict]:
+    """
+    OCR many screenshots, reusing cached results for unchanged tiles.
+
+    Args:
+        paths: Screenshot file paths
+        workers: OCR worker processes
+        batch_size: Tiles sent to a worker per task
+        cache_path: SQLite cache file (None disables caching)
+        tile_height: Tile height in pixels
+
+    Returns:
+        Dictionary of path -> {blocks, tiles, cached_tiles, width, height}
+    """
+    tiles_by_path: Dict[str, List[Tuple[int, int, str]]] = {}
+    # Digest -> first (path, y_offset, height) it was seen at, to re-crop on a miss
+    sources: Dict[str, Tuple[str, int, int]] = {}
+    sizes = {}
+
+    for path in paths:
+        with Image.open(path) as image:
+            image = image.convert("RGB")
+            sizes[path] = image.size
+            entries = []
+            for y_offset, tile in tile_image(image, tile_height):
+                key = tile_digest(tile)
+                entries.append((y_offset, tile.height, key))
+                sources.setdefault(key, (path, y_offset, tile.height))
+            tiles_by_path[path] = entries
+
+    cache = OCRCache(cache_path) if cache_path else None
+    cached = cache.get_many(list(sources)) if cache else {}
+    misses = [(key,) + sources[key] for key in sources if key not in cached]
+
+    fresh: Dict[str, List[dict]] = {}
+    if misses:
+        batches = [misses[i:i + batch_size] for i in range(0, len(misses), batch_size)]
+        opened: Dict[str, "Image.Image"] = {}
+
+        def collect(futures) -> None:
+            for future in futures:
+                results = dict(future.result())
+                fresh.update(results)
+                if cache:
+                    cache.put_many(results)
+
+        # Encode a batch only when a worker slot frees up, so memory holds a
+        # few batches of PNG bytes rather than every uncached tile on the site
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(1,)) as pool:
+            in_flight = set()
+            for batch in batches:
+                if len(in_flight) >= workers * 2:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+                in_flight.add(pool.submit(_ocr_batch, _encode_batch(batch, opened)))
+            collect(as_completed(in_flight))
+    if cache:
+        cache.close()
+
+    all_blocks = {**cached, **fresh}
+    output = {}
+    for path, entries in tiles_by_path.items():
+        output[path] = {
+            "width": sizes[path][0],
+            "height": sizes[path][1],
+            "tiles": len(entries),
+            "cached_tiles": sum(1 for _, _, key in entries if key in cached),
+            "blocks": _merge_blocks([(y, height, all_blocks[key]) for y, height, key in entries]),
+        }
+    return output
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", re.sub(r"[^\w\s]", " ", text.lower())).strip()
+
+
+def match_headings(blocks: List[dict], parsed: dict, scale: float = 1.0) -> dict:
+    """
+    Match OCR blocks to parse_html output.
+
+    Args:
+        blocks: OCR blocks in page coordinates
+        parsed: parse_html result (with ``full_text`` from include_text=True if available)
+        scale: Device pixel ratio of the screenshot (2 for mobile captures)
+
+    Returns:
+        Dictionary with:
+            - headings: Each h1-h3 with the OCR block it was found in (or None)
+            - text_as_image: Heading-sized OCR text that is not in the HTML
+    """
+    headings = [(tag, text) for tag in ("h1", "h2", "h3") for text in parsed.get(tag, [])]
+    dom_text = _normalize(" ".join(
+        [parsed.get("title") or "", parsed.get("full_text") or parsed.get("text") or ""] + [text for _, text in headings]
+    ))
+    alts = [_normalize(img.get("alt") or "") for img in parsed.get("images", [])]
+
+    heading_matches = []
+    for tag, text in headings:
+        target = _normalize(text)
+        best, best_ratio = None, 0.0
+        for block in blocks:
+            ratio = difflib.SequenceMatcher(None, target, _normalize(block["text"])).ratio()
+            if ratio > best_ratio:
+                best, best_ratio = block, ratio
+        heading_matches.append({
+            "tag": tag,
+            "text": text,
+            "rendered": best_ratio >= 0.8,
+            "box": best["box"] if best and best_ratio >= 0.8 else None,
+        })
+
+    text_as_image = []
+    for block in blocks:
+        height = (block["box"][3] - block["box"][1]) / scale
+        normalized = _normalize(block["text"])
+        if height < HEADING_MIN_HEIGHT or len(normalized) < 4:
+            continue
+        if normalized in dom_text:
+            continue
+        text_as_image.append({
+            "text": block["text"],
+            "box": block["box"],
+            "has_matching_alt": any(normalized in alt or alt in normalized for alt in alts if alt),
+        })
+
+    return {"headings": heading_matches, "text_as_image": text_as_image}
+
+
+def _collect_paths(inputs: List[str]) -> List[str]:
+    paths = []
+    for item in inputs:
+        real_path = os.path.realpath(item)
+        if os.path.isdir(real_path):
+            paths.extend(
+                os.path.join(real_path, name)
+                for name in sorted(os.listdir(real_path))
+                if name.lower().endswith((".png", ".jpg", ".jpeg", ".webp"))
+            )
+        elif os.path.isfile(real_path):
+            paths.append(real_path)
+        else:
+            print(f"Error: File not found: {item}", file=sys.stderr)
+            sys.exit(1)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR screenshots for section-level visual analysis")
+    parser.add_argument("inputs", nargs="+", help="Screenshot files or directories")
+    parser.add_argument("--html", help="Page HTML to match headings against (parse_html)")
+    parser.add_argument("--url", "-u", help="Base URL for the page HTML")
+    parser.add_argument("--scale", type=float, default=1.0, help="Device pixel ratio of the screenshots")
+    parser.add_argument("--workers", "-w", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="OCR worker processes")
+    parser.add_argument("--batch", type=int, default=4, help="Tiles per worker task")
+    parser.add_argument("--cache", default="ocr_cache.db", help="Tile cache file ('' to disable)")
+    parser.add_argument("--json", "-j", action="store_true", help="Output as JSON")
+
+    args = parser.parse_args()
+
+    paths = _collect_paths(args.inputs)
+    if not paths:
+        print("Error: No screenshots found", file=sys.stderr)
+        sys.exit(1)
+
+    results = ocr_screenshots(paths, workers=args.workers, batch_size=args.batch, cache_path=args.cache or None)
+
+    if args.html:
+        from parse_html import parse_html
+        real_path = os.path.realpath(args.html)
+        if not os.path.isfile(real_path):
+            print(f"Error: File not found: {args.html}", file=sys.stderr)
+            sys.exit(1)
+        with open(real_path, "r", encoding="utf-8") as f:
+            parsed = parse_html(f.read(), args.url, include_text=True)
+        for result in results.values():
+            result.update(match_headings(result["blocks"], parsed, scale=args.scale))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for path, result in results.items():
+        print(f"\n{os.path.basename(path)} ({result['width']}x{result['height']}, "
+              f"{result['tiles']} tiles, {result['cached_tiles']} cached)")
+        print(f"  Text blocks: {len(result['blocks'])}")
+        if "headings" in result:
+            missing = [h for h in result["headings"] if not h["rendered"]]
+            print(f"  Headings rendered: {len(result['headings']) - len(missing)}/{len(result['headings'])}")
+            for item in result["text_as_image"]:
+                alt = " (alt matches)" if item["has_matching_alt"] else ""
+                print(f"  [TEXT IN IMAGE] \"{item['text']}\" at {item['box']}{alt}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,8 @@ Parse HTML and extract SEO-relevant elements.
 Usage:
     python parse_html.py page.html
     python parse_html.py --url https://example.com
+    python parse_html.py page.html --json --trace trace.json
+    python parse_html.py page.html --profile parse.prof
 """
 
 import argparse
@@ -15,6 +17,8 @@ import sys
 from typing import Optional
 from urllib.parse import urljoin, urlparse
 
+from stage_timing import StageTimer, run_profiled, write_chrome_trace
+
 try:
     from bs4 import BeautifulSoup
 except ImportError:
@@ -22,18 +26,30 @@ except ImportError:
     sys.exit(1)
 
 
-def parse_html(html: str, base_url: Optional[str] = None) -> dict:
+def parse_html(
+    html: str,
+    base_url: Optional[str] = None,
+    trace: bool = False,
+    include_text: bool = False,
+) -> dict:
     """
     Parse HTML and extract SEO-relevant elements.
 
     Args:
         html: HTML content to parse
         base_url: Base URL for resolving relative links
+        trace: Record per-stage timing spans (soup_build, extract_*, get_text)
+        include_text: Also return the main-content text that word_count is
+            based on (``text``) and the text of the whole document including
+            header, nav and footer (``full_text``)
 
     Returns:
         Dictionary with extracted SEO data
     """
-    soup = BeautifulSoup(html, "lxml" if "lxml" in sys.modules else "html.parser")
+    timer = StageTimer(enabled=trace, category="parse")
+
+    with timer.stage("soup_build", bytes=len(html)):
+        soup = BeautifulSoup(html, "lxml" if "lxml" in sys.modules else "html.parser")
 
     result = {
         "title": None,
@@ -54,104 +70,116 @@ def parse_html(html: str, base_url: Optional[str] = None) -> dict:
         "word_count": 0,
         "hreflang": [],
     }
-
-    # Title
-    title_tag = soup.find("title")
-    if title_tag:
-        result["title"] = title_tag.get_text(strip=True)
-
-    # Meta tags
-    for meta in soup.find_all("meta"):
-        name = meta.get("name", "").lower()
-        property_attr = meta.get("property", "").lower()
-        content = meta.get("content", "")
-
-        if name == "description":
-            result["meta_description"] = content
-        elif name == "robots":
-            result["meta_robots"] = content
-
-        # Open Graph
-        if property_attr.startswith("og:"):
-            result["open_graph"][property_attr] = content
-
-        # Twitter Card
-        if name.startswith("twitter:"):
-            result["twitter_card"][name] = content
-
-    # Canonical
-    canonical = soup.find("link", rel="canonical")
-    if canonical:
-        result["canonical"] = canonical.get("href")
-
-    # Hreflang
-    for link in soup.find_all("link", rel="alternate"):
-        hreflang = link.get("hreflang")
-        if hreflang:
-            result["hreflang"].append({
-                "lang": hreflang,
-                "href": link.get("href"),
+    if trace:
+        result["timings"] = timer.spans
+
+    with timer.stage("extract_head"):
+        # Title
+        title_tag = soup.find("title")
+        if title_tag:
+            result["title"] = title_tag.get_text(strip=True)
+
+        # Meta tags
+        for meta in soup.find_all("meta"):
+            name = meta.get("name", "").lower()
+            property_attr = meta.get("property", "").lower()
+            content = meta.get("content", "")
+
+            if name == "description":
+                result["meta_description"] = content
+            elif name == "robots":
+                result["meta_robots"] = content
+
+            # Open Graph
+            if property_attr.startswith("og:"):
+                result["open_graph"][property_attr] = content
+
+            # Twitter Card
+            if name.startswith("twitter:"):
+                result["twitter_card"][name] = content
+
+        # Canonical
+        canonical = soup.find("link", rel="canonical")
+        if canonical:
+            result["canonical"] = canonical.get("href")
+
+        # Hreflang
+        for link in soup.find_all("link", rel="alternate"):
+            hreflang = link.get("hreflang")
+            if hreflang:
+                result["hreflang"].append({
+                    "lang": hreflang,
+                    "href": link.get("href"),
+                })
+
+    with timer.stage("extract_headings"):
+        for tag in ["h1", "h2", "h3"]:
+            for heading in soup.find_all(tag):
+                text = heading.get_text(strip=True)
+                if text:
+                    result[tag].append(text)
+
+    with timer.stage("extract_images"):
+        for img in soup.find_all("img"):
+            src = img.get("src", "")
+            if base_url and src:
+                src = urljoin(base_url, src)
+
+            result["images"].append({
+                "src": src,
+                "alt": img.get("alt"),
+                "width": img.get("width"),
+                "height": img.get("height"),
+                "loading": img.get("loading"),
             })
 
-    # Headings
-    for tag in ["h1", "h2", "h3"]:
-        for heading in soup.find_all(tag):
-            text = heading.get_text(strip=True)
-            if text:
-                result[tag].append(text)
-
-    # Images
-    for img in soup.find_all("img"):
-        src = img.get("src", "")
-        if base_url and src:
-            src = urljoin(base_url, src)
-
-        result["images"].append({
-            "src": src,
-            "alt": img.get("alt"),
-            "width": img.get("width"),
-            "height": img.get("height"),
-            "loading": img.get("loading"),
-        })
-
-    # Links
-    if base_url:
-        base_domain = urlparse(base_url).netloc
-
-        for a in soup.find_all("a", href=True):
-            href = a.get("href", "")
-            if not href or href.startswith("#") or href.startswith("javascript:"):
-                continue
-
-            full_url = urljoin(base_url, href)
-            parsed = urlparse(full_url)
-
-            link_data = {
-                "href": full_url,
-                "text": a.get_text(strip=True)[:100],
-                "rel": a.get("rel", []),
-            }
-
-            if parsed.netloc == base_domain:
-                result["links"]["internal"].append(link_data)
-            else:
-                result["links"]["external"].append(link_data)
-
-    # Schema (JSON-LD)
-    for script in soup.find_all("script", type="application/ld+json"):
-        try:
-            schema_data = json.loads(script.string)
-            result["schema"].append(schema_data)
-        except (json.JSONDecodeError, TypeError):
-            pass
-
-    # Word count (visible text only)
-    for element in soup(["script", "style", "nav", "footer", "header"]):
-        element.decompose()
-
-    text = soup.get_text(separator=" ", strip=True)
-    words = re.findall(r"\b\w+\b", text)
-    result["word_count"] = len(words)
+    with timer.stage("extract_links"):
+        if base_url:
+            base_domain = urlparse(base_url).netloc
+
+            for a in soup.find_all("a", href=True):
+                href = a.get("href", "")
+                if not href or href.startswith("#") or href.startswith("javascript:"):
+                    continue
+
+                full_url = urljoin(base_url, href)
+                parsed = urlparse(full_url)
+
+                link_data = {
+                    "href": full_url,
+                    "text": a.get_text(strip=True)[:100],
+                    "rel": a.get("rel", []),
+                }
+
+                if parsed.netloc == base_domain:
+                    result["links"]["internal"].append(link_data)
+                else:
+                    result["links"]["external"].append(link_data)
+
+    with timer.stage("extract_schema"):
+        # Schema (JSON-LD)
+        for script in soup.find_all("script", type="application/ld+json"):
+            try:
+                schema_data = json.loads(script.string)
+                result["schema"].append(schema_data)
+            except (json.JSONDecodeError, TypeError):
+                pass
+
+    with timer.stage("get_text"):
+        for element in soup(["script", "style"]):
+            element.decompose()
+        if include_text:
+            result["full_text"] = soup.get_text(separator=" ", strip=True)
+
+        # Word count (visible text only)
+        for element in soup(["nav", "footer", "header"]):
+            element.decompose()
+
+        text = soup.get_text(separator=" ", strip=True)
+        words = re.findall(r"\b\w+\b", text)
+        result["word_count"] = len(words)
+        if include_text:
+            result["text"] = text
 
     return result
 
@@ -161,6 +189,8 @@ def main():
     parser.add_argument("file", nargs="?", help="HTML file to parse")
     parser.add_argument("--url", "-u", help="Base URL for resolving links")
     parser.add_argument("--json", "-j", action="store_true", help="Output as JSON")
+    parser.add_argument("--trace", help="Write per-stage timings as Chrome trace JSON to this file")
+    parser.add_argument("--profile", help="Run under cProfile and write stats to this file")
 
     args = parser.parse_args()
 
@@ -174,7 +204,13 @@ def main():
     else:
         html = sys.stdin.read()
 
-    result = parse_html(html, args.url)
+    if args.profile:
+        result = run_profiled(args.profile, parse_html, html, args.url, trace=bool(args.trace))
+    else:
+        result = parse_html(html, args.url, trace=bool(args.trace))
+
+    if args.trace:
+        write_chrome_trace(result["timings"], args.trace)
 
     if args.json:
         print(json.dumps(result, indent=2))
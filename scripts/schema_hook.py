@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Load the JSON-LD validator from hooks/validate-schema.py.
+
+The hook's filename is not importable, so scripts that validate schema
+(codex_seo.py, crawl_store.py) load it through this module instead.
+"""
+
+import importlib.util
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SCHEMA_HOOK = os.path.join(os.path.dirname(SCRIPT_DIR), "hooks", "validate-schema.py")
+
+
+def load_schema_validator():
+    """
+    Load the schema hook module once and cache it in sys.modules.
+
+    Returns:
+        Module exposing validate_jsonld(html)
+
+    Raises:
+        FileNotFoundError: If the hook file is missing
+    """
+    if "validate_schema" in sys.modules:
+        return sys.modules["validate_schema"]
+
+    if not os.path.isfile(SCHEMA_HOOK):
+        raise FileNotFoundError(f"Schema validator not found: {SCHEMA_HOOK}")
+
+    spec = importlib.util.spec_from_file_location("validate_schema", SCHEMA_HOOK)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    sys.modules["validate_schema"] = module
+    return module
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Opt-in stage timing and profiling helpers for the SEO scripts.
+
+Each instrumented function (fetch_page, parse_html, analyze_visual,
+capture_screenshot) accepts ``trace=True`` and then adds a ``timings`` list
+to its result dict. Spans can be exported as Chrome trace-event JSON and
+opened in chrome://tracing or https://ui.perfetto.dev.
+
+Usage:
+    python stage_timing.py merge result1.json result2.json --output trace.json
+"""
+
+import argparse
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable, List, Optional
+
+
+class StageTimer:
+    """Record named timing spans. A disabled timer records nothing."""
+
+    def __init__(self, enabled: bool = True, category: str = "seo"):
+        self.enabled = enabled
+        self.category = category
+        self.spans: List[dict] = []
+
+    @contextmanager
+    def stage(self, name: str, **args):
+        """Time the enclosed block as one span named ``name``."""
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            span = {
+                "stage": name,
+                "category": self.category,
+                "start_us": int(start * 1_000_000),
+                "duration_ms": round((end - start) * 1000, 3),
+                "tid": threading.get_ident(),
+            }
+            if args:
+                span["args"] = args
+            self.spans.append(span)
+
+
+def to_chrome_trace(spans: Iterable[dict], pid: Optional[int] = None) -> dict:
+    """
+    Convert timing spans to Chrome trace-event format.
+
+    Args:
+        spans: Spans as produced by StageTimer (e.g. a result's ``timings``)
+        pid: Process id to attribute events to (defaults to current process)
+
+    Returns:
+        Dictionary with a ``traceEvents`` list of complete ("X") events
+    """
+    pid = os.getpid() if pid is None else pid
+    events = []
+    for span in spans:
+        events.append({
+            "name": span["stage"],
+            "cat": span.get("category", "seo"),
+            "ph": "X",
+            "ts": span["start_us"],
+            "dur": int(span["duration_ms"] * 1000),
+            "pid": pid,
+            "tid": span.get("tid", 0),
+            "args": span.get("args", {}),
+        })
+    events.sort(key=lambda e: e["ts"])
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def write_chrome_trace(spans: Iterable[dict], output_path: str) -> None:
+    """Write spans to ``output_path`` as Chrome trace-event JSON."""
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(to_chrome_trace(spans), f)
+
+
+def run_profiled(output_path: str, func: Callable, *args, **kwargs):
+    """
+    Run ``func`` under cProfile and write the stats to ``output_path``.
+
+    The raw stats file can be loaded with ``pstats`` or snakeviz. The top
+    entries by cumulative time are also printed to stderr.
+
+    Returns:
+        Whatever ``func`` returns
+    """
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args, **kwargs)
+    finally:
+        profiler.dump_stats(output_path)
+        buffer = io.StringIO()
+        pstats.Stats(profiler, stream=buffer).sort_stats("cumulative").print_stats(15)
+        print(buffer.getvalue(), file=sys.stderr)
+        print(f"Profile written to {output_path}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge result timings into a Chrome trace")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    merge = sub.add_parser("merge", help="Merge timings from JSON result files")
+    merge.add_argument("files", nargs="+", help="JSON result files with a 'timings' list")
+    merge.add_argument("--output", "-o", default="trace.json", help="Output trace file")
+
+    args = parser.parse_args()
+
+    spans = []
+    for path in args.files:
+        real_path = os.path.realpath(path)
+        if not os.path.isfile(real_path):
+            print(f"Error: File not found: {path}", file=sys.stderr)
+            sys.exit(1)
+        with open(real_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for result in data if isinstance(data, list) else [data]:
+            spans.extend(result.get("timings", []))
+
+    write_chrome_trace(spans, args.output)
+    print(f"Wrote {len(spans)} spans to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Validate hreflang clusters across a whole crawl.
+
+Builds hash indexes over crawl results (URL -> page, URL -> declared
+alternates) so every return-tag, canonical and status lookup is O(1), then
+groups pages into clusters with union-find. Total work is linear in the
+number of hreflang entries.
+
+Usage:
+    python validate_hreflang.py crawl.db
+    python validate_hreflang.py --jsonl pages.jsonl --json
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urljoin, urldefrag, urlparse, urlsplit, urlunsplit
+
+LANG_PATTERN = re.compile(
+    r"^(?P<lang>[a-z]{2,3})(?:-(?P<script>[a-z]{4}))?(?:-(?P<region>[a-z]{2}|\d{3}))?$",
+    re.IGNORECASE,
+)
+
+# Codes that match the pattern but are wrong for hreflang
+INVALID_LANGUAGES = {
+    "jp": "use 'ja' for Japanese",
+    "cn": "use 'zh' for Chinese",
+    "kr": "use 'ko' for Korean",
+    "dk": "use 'da' for Danish",
+    "se": "use 'sv' for Swedish",
+    "gr": "use 'el' for Greek",
+}
+INVALID_REGIONS = {
+    "UK": "use 'GB' for the United Kingdom",
+    "EU": "EU is not an ISO 3166-1 country",
+    "LA": "Latin America is not a country — use specific countries",
+}
+
+SEVERITY = {
+    "missing_self_reference": "Critical",
+    "missing_return_tag": "Critical",
+    "missing_x_default": "High",
+    "invalid_language_code": "High",
+    "hreflang_on_non_canonical": "High",
+    "target_non_canonical": "High",
+    "target_non_200": "High",
+    "target_redirects": "High",
+    "conflicting_language_code": "High",
+    "duplicate_language": "High",
+    "multiple_x_default": "Medium",
+    "mixed_protocols": "Medium",
+    "orphaned_alternate": "Medium",
+}
+
+
+def _normalize(url: Optional[str], base: Optional[str] = None) -> Optional[str]:
+    """Resolve against ``base``, drop the fragment and lowercase scheme and host; keep path and query exact."""
+    if not url:
+        return None
+    if base:
+        url = urljoin(base, url)
+    parts = urlsplit(urldefrag(url.strip())[0])
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, parts.query, ""))
+
+
+def check_language_code(code: str) -> Optional[str]:
+    """
+    Validate one hreflang value.
+
+    Returns:
+        None if valid, otherwise the reason it is invalid
+    """
+    if code.lower() == "x-default":
+        return None
+    match = LANG_PATTERN.match(code)
+    if not match:
+        return f"'{code}' is not language[-Script][-REGION]"
+    lang = match.group("lang").lower()
+    if len(lang) == 3:
+        return f"'{lang}' is ISO 639-2; hreflang needs ISO 639-1 two-letter codes"
+    if lang in INVALID_LANGUAGES:
+        return f"'{lang}': {INVALID_LANGUAGES[lang]}"
+    region = match.group("region")
+    if region and region.upper() in INVALID_REGIONS:
+        return f"'{region}': {INVALID_REGIONS[region.upper()]}"
+    return None
+
+
+class _UnionFind:
+    def __init__(self):
+        self.parent: Dict[str, str] = {}
+
+    def find(self, x: str) -> str:
+        self.parent.setdefault(x, x)
+        root = x
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[x] != root:
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, a: str, b: str) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[rb] = ra
+
+
+def validate_hreflang(pages: Iterable[dict]) -> dict:
+    """
+    Validate hreflang across all crawled pages.
+
+    Args:
+        pages: Records with url, final_url, status_code and parsed (the
+            parse_html result), as yielded by CrawlStore.iter_pages()
+
+    Returns:
+        Dictionary with:
+            - issues: List of {type, severity, page, target, lang, detail}
+            - clusters: List of cluster summaries
+            - summary: Issue counts by type
+    """
+    # Index 1: every known URL (requested and final) -> page record
+    by_url: Dict[str, dict] = {}
+    # Index 2: page URL -> {alternate URL: [hreflang codes]}
+    declared: Dict[str, Dict[str, List[str]]] = {}
+    # Index 3: final URL -> record of the page that declared those alternates
+    declaring: Dict[str, dict] = {}
+
+    for page in pages:
+        url = _normalize(page["url"])
+        final_url = _normalize(page.get("final_url")) or url
+        parsed = page.get("parsed") or {}
+        record = {
+            "url": url,
+            "final_url": final_url,
+            "status_code": page.get("status_code"),
+            "canonical": _normalize(parsed.get("canonical"), final_url),
+        }
+        by_url[url] = record
+        by_url.setdefault(final_url, record)
+
+        alternates: Dict[str, List[str]] = defaultdict(list)
+        for entry in parsed.get("hreflang", []):
+            href = _normalize(entry.get("href"), final_url)
+            if href and entry.get("lang"):
+                alternates[href].append(entry["lang"])
+        if alternates:
+            declared[final_url] = dict(alternates)
+            declaring[final_url] = record
+
+    issues: List[dict] = []
+
+    def report(issue_type: str, page: str, target: Optional[str] = None,
+               lang: Optional[str] = None, detail: str = "") -> None:
+        issues.append({
+            "type": issue_type,
+            "severity": SEVERITY[issue_type],
+            "page": page,
+            "target": target,
+            "lang": lang,
+            "detail": detail,
+        })
+
+    clusters = _UnionFind()
+    # URL -> set of codes any cluster member assigns to it
+    codes_for_url: Dict[str, set] = defaultdict(set)
+
+    for page_url, alternates in declared.items():
+        record = declaring[page_url]
+        clusters.find(page_url)
+
+        if record["canonical"] and record["canonical"] != page_url:
+            report("hreflang_on_non_canonical", page_url, record["canonical"],
+                   detail="hreflang on a page whose canonical points elsewhere is ignored")
+
+        if page_url not in alternates:
+            report("missing_self_reference", page_url,
+                   detail="page does not list itself among its alternates")
+
+        lang_targets: Dict[str, set] = defaultdict(set)
+        x_defaults = 0
+        schemes = set()
+
+        for target, langs in alternates.items():
+            clusters.union(page_url, target)
+            schemes.add(urlparse(target).scheme)
+
+            for lang in langs:
+                reason = check_language_code(lang)
+                if reason:
+                    report("invalid_language_code", page_url, target, lang, reason)
+                if lang.lower() == "x-default":
+                    x_defaults += 1
+                else:
+                    lang_targets[lang.lower()].add(target)
+                    codes_for_url[target].add(lang.lower())
+
+            if target == page_url:
+                continue
+
+            target_record = by_url.get(target)
+            if target_record is None:
+                report("orphaned_alternate", page_url, target, langs[0],
+                       detail="alternate was not found in the crawl")
+                continue
+
+            if target_record["final_url"] != target:
+                report("target_redirects", page_url, target, langs[0],
+                       detail=f"redirects to {target_record['final_url']}")
+            elif target_record["status_code"] != 200:
+                report("target_non_200", page_url, target, langs[0],
+                       detail=f"status {target_record['status_code']}")
+            elif target_record["canonical"] and target_record["canonical"] != target:
+                report("target_non_canonical", page_url, target, langs[0],
+                       detail=f"canonical is {target_record['canonical']}")
+
+            target_alternates = declared.get(target_record["final_url"])
+            if target_alternates is None:
+                report("orphaned_alternate", page_url, target, langs[0],
+                       detail="alternate declares no hreflang tags")
+            elif page_url not in target_alternates:
+                report("missing_return_tag", page_url, target, langs[0],
+                       detail="alternate does not link back to this page")
+
+        for lang, targets in lang_targets.items():
+            if len(targets) > 1:
+                report("duplicate_language", page_url, lang=lang,
+                       detail=f"'{lang}' points to {len(targets)} different URLs")
+        if x_defaults > 1:
+            report("multiple_x_default", page_url, detail=f"{x_defaults} x-default tags")
+        if len(schemes) > 1:
+            report("mixed_protocols", page_url, detail="alternates mix http and https")
+
+    members: Dict[str, List[str]] = defaultdict(list)
+    for url in clusters.parent:
+        members[clusters.find(url)].append(url)
+
+    cluster_summaries = []
+    for root, urls in members.items():
+        urls.sort()
+        has_x_default = any(
+            lang.lower() == "x-default"
+            for url in urls
+            for langs in declared.get(url, {}).values()
+            for lang in langs
+        )
+        if not has_x_default:
+            report("missing_x_default", urls[0], detail=f"cluster of {len(urls)} URLs has no x-default")
+
+        for url in urls:
+            if len(codes_for_url.get(url, ())) > 1:
+                report("conflicting_language_code", url, lang=", ".join(sorted(codes_for_url[url])),
+                       detail="cluster members label this URL with different codes")
+
+        cluster_summaries.append({
+            "urls": urls,
+            "size": len(urls),
+            "languages": sorted({code for url in urls for code in codes_for_url.get(url, ())}),
+            "x_default": has_x_default,
+        })
+
+    summary: Dict[str, int] = defaultdict(int)
+    for issue in issues:
+        summary[issue["type"]] += 1
+
+    cluster_summaries.sort(key=lambda c: c["urls"][0])
+    return {
+        "issues": issues,
+        "clusters": cluster_summaries,
+        "summary": dict(summary),
+    }
+
+
+def _read_jsonl(path: str) -> Iterable[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate hreflang clusters across a crawl")
+    parser.add_argument("db", nargs="?", help="Crawl store database (from crawl_store.py)")
+    parser.add_argument("--jsonl", help="JSON lines file of {url, final_url, status_code, parsed} records")
+    parser.add_argument("--json", "-j", action="store_true", help="Output as JSON")
+
+    args = parser.parse_args()
+
+    source = args.jsonl or args.db
+    if not source:
+        parser.error("a crawl store database or --jsonl file is required")
+    real_path = os.path.realpath(source)
+    if not os.path.isfile(real_path):
+        print(f"Error: File not found: {source}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.jsonl:
+        result = validate_hreflang(_read_jsonl(real_path))
+    else:
+        from crawl_store import CrawlStore
+        with CrawlStore(real_path) as store:
+            result = validate_hreflang(store.iter_pages())
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"Clusters: {len(result['clusters'])}")
+        print(f"Issues: {len(result['issues'])}")
+        for issue_type, count in sorted(result["summary"].items(), key=lambda kv: -kv[1]):
+            print(f"  [{SEVERITY[issue_type]}] {issue_type}: {count}")
+        for issue in result["issues"][:50]:
+            target = f" -> {issue['target']}" if issue["target"] else ""
+            print(f"  {issue['type']}: {issue['page']}{target} {issue['detail']}")
+        if len(result["issues"]) > 50:
+            print(f"  ... {len(result['issues']) - 50} more (use --json for all)")
+
+
+if __name__ == "__main__":
+    main()